@@ -0,0 +1,257 @@
+"""Версии коллекций, кеш ответов и условные GET-запросы API.
+
+Каждая коллекция (произведения, жанры, отзывы и т.д.) имеет версию —
+отметку времени последнего изменения в наносекундах. Кроме общих
+коллекций ('review') есть коллекции по родителю ('review:title:1').
+Версии хранятся в кеше settings.API_CACHE_ALIAS и меняются обработчиками
+сигналов после фиксации транзакции. Ключ кешированного ответа и ETag
+включают версии всех коллекций, от которых зависит представление,
+поэтому запись в любую из них делает старые ответы недостижимыми
+без явной очистки.
+"""
+import time
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.http import (
+    http_date,
+    parse_etags,
+    parse_http_date_safe,
+    quote_etag,
+)
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+VERSION_KEY = 'api:version:{}'
+RESPONSE_KEY = 'api:response:{}'
+HITS_KEY = 'api:stats:hits'
+MISSES_KEY = 'api:stats:misses'
+
+
+def get_cache():
+    return caches[settings.API_CACHE_ALIAS]
+
+
+def get_versions(collections):
+    """Возвращает версии коллекций, создавая отсутствующие."""
+    cache = get_cache()
+    keys = {collection: VERSION_KEY.format(collection)
+            for collection in collections}
+    stored = cache.get_many(keys.values())
+    versions = {}
+    for collection, key in keys.items():
+        if key not in stored:
+            cache.add(key, time.time_ns(), timeout=None)
+            stored[key] = cache.get(key)
+        versions[collection] = stored[key]
+    return versions
+
+
+def bump_versions(collections):
+    """Отмечает изменение коллекций."""
+    now = time.time_ns()
+    get_cache().set_many(
+        {VERSION_KEY.format(collection): now for collection in collections},
+        timeout=None,
+    )
+
+
+def increment_counter(key):
+    cache = get_cache()
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats():
+    cache = get_cache()
+    stats = cache.get_many((HITS_KEY, MISSES_KEY))
+    return {
+        'hits': stats.get(HITS_KEY, 0),
+        'misses': stats.get(MISSES_KEY, 0),
+    }
+
+
+def normalize_query_params(query_params, keep_empty=()):
+    """Параметры запроса в каноническом виде.
+
+    Ключи сортируются, пустые значения отбрасываются (фильтры их
+    игнорируют), кроме параметров из keep_empty.
+    """
+    normalized = []
+    for key in sorted(query_params):
+        values = [value.strip() for value in query_params.getlist(key)]
+        if key not in keep_empty:
+            values = [value for value in values if value]
+            if not values:
+                continue
+        normalized.append((key, values))
+    return normalized
+
+
+def get_request_digest(prefix, versions, query_params, keep_empty=()):
+    """Хеш запроса с учётом версий коллекций."""
+    raw = repr((
+        prefix,
+        sorted(versions.items()),
+        normalize_query_params(query_params, keep_empty),
+    ))
+    return md5(raw.encode()).hexdigest()
+
+
+def strip_weak_prefix(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+class CollectionVersionsMixin:
+    """Версии коллекций, от которых зависит ответ представления.
+
+    cache_collections — шаблоны названий коллекций, которые
+    подставляются из kwargs запроса: ('review:title:{title_id}',).
+    """
+
+    cache_collections = ()
+    cache_keep_empty_params = ('cursor',)
+
+    def get_cache_collections(self):
+        return [
+            collection.format(**self.kwargs)
+            for collection in self.cache_collections
+        ]
+
+    def get_collection_versions(self):
+        if not hasattr(self, '_collection_versions'):
+            self._collection_versions = get_versions(
+                self.get_cache_collections()
+            )
+        return self._collection_versions
+
+    def get_request_digest(self, request):
+        if not hasattr(self, '_request_digest'):
+            self._request_digest = get_request_digest(
+                (self.basename, self.action, sorted(self.kwargs.items())),
+                self.get_collection_versions(),
+                request.query_params,
+                self.cache_keep_empty_params,
+            )
+        return self._request_digest
+
+
+class NotModified(APIException):
+    status_code = status.HTTP_304_NOT_MODIFIED
+
+
+class ConditionalGetMixin(CollectionVersionsMixin):
+    """ETag и Last-Modified для list и retrieve по версиям коллекций.
+
+    Проверка If-None-Match и If-Modified-Since выполняется до вызова
+    обработчика, поэтому ответ 304 не требует ни запроса к базе,
+    ни сериализации.
+    """
+
+    conditional_actions = ('list', 'retrieve')
+
+    def is_conditional_request(self, request):
+        return (
+            request.method in ('GET', 'HEAD')
+            and getattr(self, 'action', None) in self.conditional_actions
+        )
+
+    def get_etag(self, request):
+        return 'W/' + quote_etag(self.get_request_digest(request))
+
+    def get_last_modified(self):
+        versions = self.get_collection_versions()
+        return max(versions.values()) // 10 ** 9 if versions else None
+
+    def is_not_modified(self, request):
+        if_none_match = request.headers.get('If-None-Match')
+        if if_none_match:
+            # «*» совпадает с любым существующим представлением, но
+            # проверка идёт до поиска объекта, поэтому для GET он не
+            # считается совпадением: иначе 304 получил бы и ответ 404.
+            etag = strip_weak_prefix(self.get_etag(request))
+            return any(
+                strip_weak_prefix(tag) == etag
+                for tag in parse_etags(if_none_match)
+            )
+        if_modified_since = parse_http_date_safe(
+            request.headers.get('If-Modified-Since', '')
+        )
+        last_modified = self.get_last_modified()
+        return (
+            if_modified_since is not None
+            and last_modified is not None
+            and last_modified <= if_modified_since
+        )
+
+    def set_conditional_headers(self, request, response):
+        response['ETag'] = self.get_etag(request)
+        last_modified = self.get_last_modified()
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.is_conditional_request(request) and self.is_not_modified(
+            request
+        ):
+            raise NotModified()
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            self.set_conditional_headers(self.request, response)
+            return response
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        if (
+            response.status_code == status.HTTP_200_OK
+            and self.is_conditional_request(request)
+        ):
+            self.set_conditional_headers(request, response)
+        return response
+
+
+class CachedResponseMixin(CollectionVersionsMixin):
+    """Кеширует ответы list и retrieve представления.
+
+    В кеш кладутся данные ответа до рендеринга, поэтому формат ответа
+    по-прежнему выбирается согласованием содержимого.
+    """
+
+    cache_timeout = None
+
+    def list(self, request, *args, **kwargs):
+        return self.get_cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.get_cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def get_cached_response(self, handler, request, *args, **kwargs):
+        cache = get_cache()
+        key = RESPONSE_KEY.format(self.get_request_digest(request))
+        cached = cache.get(key)
+        if cached is not None:
+            increment_counter(HITS_KEY)
+            response = Response(cached)
+            response['X-Cache'] = 'HIT'
+            return response
+
+        increment_counter(MISSES_KEY)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            timeout = self.cache_timeout or settings.API_CACHE_TIMEOUT
+            cache.set(key, response.data, timeout=timeout)
+        response['X-Cache'] = 'MISS'
+        return response
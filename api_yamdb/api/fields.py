@@ -0,0 +1,43 @@
+from django.utils.encoding import smart_str
+from rest_framework.relations import (
+    MANY_RELATION_KWARGS,
+    ManyRelatedField,
+    SlugRelatedField,
+)
+
+
+class ManySlugRelatedField(ManyRelatedField):
+    """Список slug'ов, который разрешается одним запросом к базе."""
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        slugs = [smart_str(item) for item in data]
+        objects = {
+            getattr(obj, child.slug_field): obj
+            for obj in child.get_queryset().filter(
+                **{f'{child.slug_field}__in': slugs}
+            )
+        }
+        for slug in slugs:
+            if slug not in objects:
+                child.fail(
+                    'does_not_exist', slug_name=child.slug_field, value=slug
+                )
+        return [objects[slug] for slug in slugs]
+
+
+class BulkSlugRelatedField(SlugRelatedField):
+    """SlugRelatedField, который при many=True не делает запрос на slug."""
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return ManySlugRelatedField(**list_kwargs)
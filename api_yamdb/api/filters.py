@@ -1,16 +1,154 @@
+from functools import reduce
+from operator import or_
+
+from django.db import connection
+from django.db.models import Q
 from django_filters.rest_framework import (
     FilterSet,
     CharFilter,
+    NumberFilter,
 )
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import OrderingFilter, SearchFilter
+
+from api_yamdb.utils import normalize_text
 
 from reviews.models import Title
+from reviews.search import (
+    filter_titles_by_name,
+    is_search_available,
+    search_titles,
+)
 
 
 class TitleFilter(FilterSet):
     genre = CharFilter(field_name='genre__slug')
     category = CharFilter(field_name='category__slug')
-    name = CharFilter(field_name='name', lookup_expr='icontains')
+    year_min = NumberFilter(field_name='year', lookup_expr='gte')
+    year_max = NumberFilter(field_name='year', lookup_expr='lte')
+    name = CharFilter(field_name='name', method='filter_name')
+    search = CharFilter(method='filter_search')
 
     class Meta:
         model = Title
         fields = ('year', 'name', 'genre__slug', 'category__slug')
+
+    def filter_name(self, queryset, name, value):
+        """Подстрока в названии; по возможности через триграммный индекс."""
+        if is_search_available(connection):
+            filtered = filter_titles_by_name(queryset, value)
+            if filtered is not None:
+                return filtered
+        return queryset.filter(name_normalized__contains=normalize_text(value))
+
+    def filter_search(self, queryset, name, value):
+        """Полнотекстовый поиск по названию и описанию с ранжированием."""
+        if not is_search_available(connection):
+            return queryset.filter(
+                Q(name_normalized__contains=normalize_text(value))
+                | Q(description__icontains=value)
+            )
+        filtered = search_titles(queryset, value)
+        if filtered is None:
+            return queryset.none()
+        return filtered
+
+
+class NormalizedSearchFilter(SearchFilter):
+    """Поиск по полям с нормализованным текстом.
+
+    Термины поиска приводятся к тому же виду, что и значения в полях
+    *_normalized, поэтому сравнение регистрозависимое и корректно
+    работает для кириллицы. Индекс по полю используют точный поиск (=)
+    и поиск по началу (^): он превращается в диапазон
+    term <= value < term + PREFIX_UPPER_BOUND. Поиск подстроки
+    (поле без префикса) индексом не ускоряется и читает всю таблицу.
+    """
+
+    # Наибольший символ Unicode: ни одно значение с префиксом term
+    # не превосходит term + этот символ.
+    PREFIX_UPPER_BOUND = '\U0010ffff'
+
+    lookup_prefixes = {
+        '^': 'prefix',
+        '=': 'exact',
+    }
+
+    def get_search_terms(self, request):
+        terms = super().get_search_terms(request)
+        return [normalize_text(term) for term in terms]
+
+    def construct_search(self, field_name):
+        if field_name[0] in self.lookup_prefixes:
+            return super().construct_search(field_name)
+        return f'{field_name}__contains'
+
+    def get_term_condition(self, orm_lookup, term):
+        field_name, lookup = orm_lookup.rsplit('__', 1)
+        if lookup == 'prefix':
+            return Q(**{
+                f'{field_name}__gte': term,
+                f'{field_name}__lt': term + self.PREFIX_UPPER_BOUND,
+            })
+        return Q(**{orm_lookup: term})
+
+    def filter_queryset(self, request, queryset, view):
+        """Как в SearchFilter: каждый термин ищется хотя бы в одном поле.
+
+        Поля поиска принадлежат самой модели, поэтому distinct не нужен.
+        """
+        search_fields = self.get_search_fields(view, request)
+        search_terms = self.get_search_terms(request)
+        if not search_fields or not search_terms:
+            return queryset
+        orm_lookups = [
+            self.construct_search(str(field)) for field in search_fields
+        ]
+        for term in search_terms:
+            queryset = queryset.filter(reduce(or_, (
+                self.get_term_condition(orm_lookup, term)
+                for orm_lookup in orm_lookups
+            )))
+        return queryset
+
+
+class StrictOrderingFilter(OrderingFilter):
+    """Сортировка по одному полю из ordering_fields.
+
+    Неизвестное поле или сортировка по нескольким полям дают ответ 400:
+    составной порядок не закрыт индексом и сортируется во временном
+    дереве. В конец добавляется id в направлении поля: порядок
+    стабилен между страницами, а сортировку закрывает индекс по полю
+    (SQLite хранит rowid в каждом индексе). Без параметра список
+    упорядочивается по id, если фильтры не задали свой порядок.
+    """
+
+    tiebreak_field = 'id'
+
+    def get_ordering(self, request, queryset, view):
+        params = request.query_params.get(self.ordering_param)
+        if params is None:
+            return self.get_default_ordering(view)
+        field = params.strip()
+        valid_fields = {
+            name for name, _ in self.get_valid_fields(
+                queryset, view, {'request': request}
+            )
+        }
+        if field.lstrip('-') not in valid_fields:
+            raise ValidationError({self.ordering_param: [
+                'Допустимая сортировка: одно поле из '
+                f'{", ".join(sorted(valid_fields))}, «-» для убывания.'
+            ]})
+        if field.lstrip('-') == self.tiebreak_field:
+            return [field]
+        direction = '-' if field.startswith('-') else ''
+        return [field, direction + self.tiebreak_field]
+
+    def filter_queryset(self, request, queryset, view):
+        ordering = self.get_ordering(request, queryset, view)
+        if ordering:
+            return queryset.order_by(*ordering)
+        if not queryset.ordered:
+            return queryset.order_by(self.tiebreak_field)
+        return queryset
@@ -1,11 +1,20 @@
-from rest_framework import mixins, filters
+from django.db.models import Count, Subquery
+from rest_framework import mixins
+from rest_framework.exceptions import ValidationError
+from rest_framework.fields import IntegerField
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
 from rest_framework.viewsets import GenericViewSet
 
+from reviews.utils import prefetch_per_parent
+from .cache import ConditionalGetMixin
+from .filters import NormalizedSearchFilter
 from .permissions import IsAdminOrReadOnly
 
 
 class CreateDestiyListModelMixin(
+    ConditionalGetMixin,
     mixins.CreateModelMixin,
     mixins.ListModelMixin,
     mixins.DestroyModelMixin,
@@ -15,6 +24,235 @@ class CreateDestiyListModelMixin(
 
     permission_classes = (IsAdminOrReadOnly,)
     pagination_class = LimitOffsetPagination
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('name',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('name_normalized',)
     lookup_field = 'slug'
+
+
+class SparseFieldsQuerysetMixin:
+    """Загружает из базы только поля, выбранные ?fields= и ?omit=.
+
+    sparse_model_fields: поле сериализатора -> поля модели для only();
+    по умолчанию поле модели называется так же, как поле сериализатора.
+    """
+
+    sparse_model_fields = {}
+
+    def get_requested_fields(self):
+        serializer_class = self.get_serializer_class()
+        if not hasattr(serializer_class, 'get_requested_fields'):
+            return None
+        return serializer_class.get_requested_fields(self.request)
+
+    def prune_queryset(self, queryset, requested):
+        if requested is None:
+            return queryset
+        # Поля сортировки нужны курсорной пагинации для построения ссылок.
+        model_fields = {'pk'}.union(
+            name.lstrip('-') for name in getattr(self, 'cursor_ordering', ())
+        )
+        for name in requested:
+            model_fields.update(self.sparse_model_fields.get(name, (name,)))
+        return queryset.only(*model_fields)
+
+
+class IncludeMixin:
+    """Встраивает связанные объекты по ?include=reviews,reviews.author.
+
+    include_relations: путь -> описание связи. Путь первого уровня -
+    обратная связь модели, которая загружается prefetch_per_parent:
+        queryset - связанные объекты в порядке вывода;
+        parent_field - поле связанной модели, указывающее на родителя;
+        to_attr - атрибут родителя со списком встроенных объектов;
+        limit_param, default_limit, max_limit - параметр запроса с
+        количеством объектов на родителя и его границы.
+    Вложенный путь (reviews.author) - ForeignKey встроенного объекта,
+    он загружается select_related тем же запросом. cache_collections
+    выбранных путей добавляются к версиям ответа.
+
+    Связанные объекты загружаются в get_serializer для уже выбранных
+    родителей (страницы, объекта или списка top): на каждую связь
+    первого уровня один запрос, читающий не больше limit строк на
+    родителя. При встраивании ответ собирает include_serializer_class;
+    запись параметр не учитывает.
+    """
+
+    include_relations = {}
+    include_query_param = 'include'
+    include_serializer_class = None
+
+    def get_include_paths(self):
+        """Выбранные пути вместе с родительскими; один раз за запрос."""
+        if not hasattr(self, '_include_paths'):
+            self._include_paths = self.parse_include_paths()
+        return self._include_paths
+
+    def parse_include_paths(self):
+        if self.request.method not in SAFE_METHODS:
+            return ()
+        value = self.request.query_params.get(self.include_query_param, '')
+        paths = [path.strip() for path in value.split(',') if path.strip()]
+        unknown = set(paths).difference(self.include_relations)
+        if unknown:
+            raise ValidationError({
+                self.include_query_param: [
+                    f'Неизвестные связи: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        parts = [path.split('.') for path in paths]
+        return tuple(dict.fromkeys(
+            '.'.join(names[:depth])
+            for names in parts
+            for depth in range(1, len(names) + 1)
+        ))
+
+    def get_include_limit(self, relation):
+        param = relation['limit_param']
+        value = self.request.query_params.get(param)
+        if value is None:
+            return relation['default_limit']
+        field = IntegerField(min_value=1, max_value=relation['max_limit'])
+        try:
+            return field.run_validation(value)
+        except ValidationError as error:
+            raise ValidationError({param: error.detail})
+
+    def prefetch_included(self, parents):
+        """Загружает выбранные связи первого уровня для parents.
+
+        Связи вне полей ответа из ?fields= не загружаются.
+        """
+        paths = self.get_include_paths()
+        requested = self.get_requested_fields()
+        for path in paths:
+            if '.' in path or (requested is not None
+                               and path not in requested):
+                continue
+            relation = self.include_relations[path]
+            queryset = relation['queryset'].all()
+            nested = [
+                nested_path[len(path) + 1:].replace('.', '__')
+                for nested_path in paths
+                if nested_path.startswith(f'{path}.')
+            ]
+            if nested:
+                queryset = queryset.select_related(*nested)
+            prefetch_per_parent(
+                parents,
+                queryset,
+                relation['parent_field'],
+                self.get_include_limit(relation),
+                relation['to_attr'],
+            )
+
+    def get_serializer(self, *args, **kwargs):
+        if args and self.get_include_paths():
+            instance, *rest = args
+            if kwargs.get('many'):
+                instance = list(instance)
+                self.prefetch_included(instance)
+            else:
+                self.prefetch_included([instance])
+            args = (instance, *rest)
+        return super().get_serializer(*args, **kwargs)
+
+    def get_cache_collections(self):
+        collections = super().get_cache_collections()
+        for path in self.get_include_paths():
+            collections.extend(
+                self.include_relations[path].get('cache_collections', ())
+            )
+        return list(dict.fromkeys(collections))
+
+    def get_serializer_class(self):
+        if self.get_include_paths():
+            return self.include_serializer_class
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['include'] = self.get_include_paths()
+        return context
+
+
+class FacetsMixin:
+    """Добавляет к списку счётчики по значениям полей (?facets=a,b).
+
+    facet_fields: имя фасета -> {ключ в ответе: поле модели}.
+    Каждый фасет считается одним запросом с GROUP BY по тем же
+    объектам, что отобрали фильтры. Фасеты добавляются в данные
+    ответа, поэтому кешируются вместе со списком.
+    """
+
+    facet_fields = {}
+    facets_query_param = 'facets'
+
+    def get_requested_facets(self):
+        value = self.request.query_params.get(self.facets_query_param, '')
+        names = [name.strip() for name in value.split(',') if name.strip()]
+        unknown = set(names).difference(self.facet_fields)
+        if unknown:
+            raise ValidationError({
+                self.facets_query_param: [
+                    f'Неизвестные фасеты: {", ".join(sorted(unknown))}.'
+                ]
+            })
+        return list(dict.fromkeys(names))
+
+    def get_facet(self, queryset, name):
+        fields = self.facet_fields[name]
+        lookups = list(fields.values())
+        rows = (
+            queryset.model.objects
+            .filter(pk__in=Subquery(queryset.values('pk')))
+            .exclude(**{f'{lookups[0]}__isnull': True})
+            .values(*lookups)
+            .annotate(count=Count('pk'))
+            .order_by('-count', *lookups)
+        )
+        return [
+            {
+                **{key: row[lookup] for key, lookup in fields.items()},
+                'count': row['count'],
+            }
+            for row in rows
+        ]
+
+    def list(self, request, *args, **kwargs):
+        facets = self.get_requested_facets()
+        response = super().list(request, *args, **kwargs)
+        if facets:
+            # Порядок сортировки и связанные объекты для подсчёта не нужны.
+            queryset = self.filter_queryset(self.queryset.all()).order_by()
+            response.data['facets'] = {
+                name: self.get_facet(queryset, name) for name in facets
+            }
+        return response
+
+
+class ValuesListMixin:
+    """Быстрый list через values() вместо сериализатора моделей.
+
+    values_reader_class должен давать те же данные, что и сериализатор
+    представления; None выключает быстрый путь.
+    """
+
+    values_reader_class = None
+
+    def get_values_reader_class(self):
+        return self.values_reader_class
+
+    def list(self, request, *args, **kwargs):
+        reader_class = self.get_values_reader_class()
+        if reader_class is None:
+            return super().list(request, *args, **kwargs)
+        reader = reader_class(self.get_requested_fields())
+        queryset = reader.get_values(
+            self.filter_queryset(self.get_queryset())
+        )
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(
+                reader.to_representation(page)
+            )
+        return Response(reader.to_representation(queryset))
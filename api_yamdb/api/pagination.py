@@ -0,0 +1,73 @@
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import (
+    CursorPagination,
+    LimitOffsetPagination,
+    PageNumberPagination,
+)
+from rest_framework.settings import api_settings
+
+
+class ViewCursorPagination(CursorPagination):
+    """Курсорная пагинация по cursor_ordering представления.
+
+    Не выполняет COUNT и не использует OFFSET: следующая страница
+    выбирается по позиции в стабильной сортировке.
+    """
+
+    ordering = ('id',)
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'cursor_ordering', self.ordering)
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+
+class OptionalCursorPagination(ViewCursorPagination):
+    """Курсорная пагинация, которая включается параметром ?cursor=.
+
+    Без параметра cursor запрос обслуживает прежний класс пагинации,
+    поэтому существующие клиенты получают ответ в привычном формате.
+    """
+
+    fallback_class = None
+
+    def is_cursor_request(self, request):
+        return self.cursor_query_param in request.query_params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if self.is_cursor_request(request):
+            # Курсор строится по cursor_ordering, поэтому другой порядок
+            # с ним несовместим.
+            if api_settings.ORDERING_PARAM in request.query_params:
+                raise ValidationError({api_settings.ORDERING_PARAM: [
+                    'Сортировка не поддерживается в курсорном режиме.'
+                ]})
+            self.fallback = None
+            return super().paginate_queryset(queryset, request, view)
+        self.fallback = self.fallback_class()
+        return self.fallback.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.fallback is not None:
+            return self.fallback.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def get_html_context(self):
+        if self.fallback is not None:
+            return self.fallback.get_html_context()
+        return super().get_html_context()
+
+
+class CursorOrLimitOffsetPagination(OptionalCursorPagination):
+    """?cursor= или limit/offset по умолчанию."""
+
+    fallback_class = LimitOffsetPagination
+
+
+class CursorOrPageNumberPagination(OptionalCursorPagination):
+    """?cursor= или постраничная пагинация по умолчанию."""
+
+    fallback_class = PageNumberPagination
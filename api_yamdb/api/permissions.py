@@ -44,3 +44,17 @@ class IsAuthenticatedOrReadOnly(BasePermission):
             or request.user.is_admin
             or obj.author == request.user
         )
+
+
+class IsProfileOwnerOrModerator(BasePermission):
+    def has_permission(self, request, view):
+        """Ленту пользователя видят он сам, модераторы и админы.
+
+        Пользователь из URL задаётся username или словом me.
+        """
+        user = request.user
+        return user.is_authenticated and (
+            view.kwargs.get('username') in ('me', user.username)
+            or user.is_moderator
+            or user.is_admin
+        )
@@ -1,8 +1,18 @@
 from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
-from rest_framework.fields import CurrentUserDefault, IntegerField
+from django.db import IntegrityError, transaction
+from django.db.models import prefetch_related_objects
+from rest_framework.fields import (
+    CurrentUserDefault,
+    FloatField,
+    IntegerField,
+    ListField,
+    SlugField,
+)
+from rest_framework.permissions import SAFE_METHODS
 from rest_framework.relations import SlugRelatedField
+from rest_framework.settings import api_settings
 from rest_framework.serializers import (
+    ListSerializer,
     ModelSerializer,
     Serializer,
     CharField,
@@ -13,16 +23,71 @@ from rest_framework.serializers import (
 from api_yamdb import settings
 from reviews.models import (
     Category,
+    DeletionTask,
     Genre,
     Title,
+    TitleGenre,
     Review,
     Comment,
 )
 from users.validators import validate_username, username_validator
+from .fields import BulkSlugRelatedField
 
 User = get_user_model()
 
 
+class SparseFieldsMixin:
+    """Выбор полей ответа параметрами ?fields= и ?omit=.
+
+    Работает только для безопасных запросов, чтобы при записи
+    не отбрасывались поля. Представления используют тот же список
+    полей, чтобы не загружать из базы лишнее. Поля из optional_fields
+    выводятся, только если перечислены в ?fields=.
+    """
+
+    optional_fields = ()
+
+    @classmethod
+    def get_default_fields(cls):
+        return tuple(
+            name for name in cls.Meta.fields
+            if name not in cls.optional_fields
+        )
+
+    @staticmethod
+    def split_param(value):
+        return [name.strip() for name in (value or '').split(',')
+                if name.strip()]
+
+    @classmethod
+    def get_requested_fields(cls, request):
+        """Кортеж выбранных полей или None, если выбор не задан."""
+        if request is None or request.method not in SAFE_METHODS:
+            return None
+        fields = cls.split_param(request.query_params.get('fields'))
+        omit = cls.split_param(request.query_params.get('omit'))
+        if not fields and not omit:
+            return None
+        unknown = set(fields).union(omit).difference(cls.Meta.fields)
+        if unknown:
+            raise ValidationError({
+                'fields': [f'Неизвестные поля: {", ".join(sorted(unknown))}.']
+            })
+        available = cls.Meta.fields if fields else cls.get_default_fields()
+        return tuple(
+            name for name in available
+            if (not fields or name in fields) and name not in omit
+        )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.get_requested_fields(self.context.get('request'))
+        if requested is None:
+            requested = self.get_default_fields()
+        for name in set(self.fields).difference(requested):
+            self.fields.pop(name)
+
+
 class CategorySerializer(ModelSerializer):
     """Вывод списка категорий."""
 
@@ -48,7 +113,7 @@ class GenreSerializer(ModelSerializer):
 class TitleWriteSerializer(ModelSerializer):
     """Сериализатор создания и редактирования произведения."""
 
-    genre = SlugRelatedField(
+    genre = BulkSlugRelatedField(
         many=True, slug_field='slug', queryset=Genre.objects.all()
     )
     category = SlugRelatedField(
@@ -63,13 +128,15 @@ class TitleWriteSerializer(ModelSerializer):
         return TitleReadSerializer(instance).data
 
 
-class TitleReadSerializer(ModelSerializer):
+class TitleReadSerializer(SparseFieldsMixin, ModelSerializer):
     """Сериализатор вывода произведений."""
 
     genre = GenreSerializer(read_only=True, many=True)
     category = CategorySerializer(read_only=True)
     rating = IntegerField(read_only=True, default=None)
 
+    optional_fields = ('weighted_rating',)
+
     class Meta:
         model = Title
         fields = (
@@ -77,13 +144,253 @@ class TitleReadSerializer(ModelSerializer):
             'name',
             'year',
             'rating',
+            'reviews_count',
             'description',
             'genre',
             'category',
+            'weighted_rating',
         )
 
 
-class ReviewSerializer(ModelSerializer):
+class TitleValuesReader:
+    """Вывод произведений через values() без ModelSerializer.
+
+    Возвращает те же данные, что TitleReadSerializer, но не создаёт
+    экземпляры моделей и не обходит поля DRF для каждой строки.
+    Жанры загружаются одним запросом и, как и в основном пути,
+    упорядочены по slug.
+    """
+
+    columns = {
+        'id': ('id',),
+        'name': ('name',),
+        'year': ('year',),
+        'rating': ('rating',),
+        'reviews_count': ('reviews_count',),
+        'weighted_rating': ('weighted_rating',),
+        'description': ('description',),
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+    }
+
+    def __init__(self, fields=None):
+        self.fields = (
+            TitleReadSerializer.get_default_fields()
+            if fields is None else fields
+        )
+
+    def get_values(self, queryset):
+        columns = dict.fromkeys(('id',))
+        for name in self.fields:
+            columns.update(dict.fromkeys(self.columns[name]))
+        return queryset.prefetch_related(None).values(*columns)
+
+    def get_genres(self, title_ids):
+        genres = {}
+        rows = (
+            TitleGenre.objects
+            .filter(title_id__in=title_ids)
+            .order_by('genre__slug')
+            .values_list('title_id', 'genre__name', 'genre__slug')
+        )
+        for title_id, name, slug in rows:
+            genres.setdefault(title_id, []).append(
+                {'name': name, 'slug': slug}
+            )
+        return genres
+
+    def to_item(self, row, genres):
+        item = {}
+        for name in self.fields:
+            if name == 'genre':
+                item[name] = genres.get(row['id'], [])
+            elif name == 'category':
+                item[name] = None if row['category'] is None else {
+                    'name': row['category__name'],
+                    'slug': row['category__slug'],
+                }
+            elif name == 'rating':
+                rating = row['rating']
+                item[name] = None if rating is None else int(rating)
+            else:
+                item[name] = row[name]
+        return item
+
+    def to_representation(self, rows):
+        rows = list(rows)
+        genres = {}
+        if 'genre' in self.fields:
+            genres = self.get_genres([row['id'] for row in rows])
+        return [self.to_item(row, genres) for row in rows]
+
+
+class TopTitlesParamsSerializer(Serializer):
+    """Параметры запроса лучших произведений."""
+
+    category = SlugField(required=False)
+    genre = SlugField(required=False)
+    limit = IntegerField(
+        min_value=1,
+        max_value=settings.TOP_TITLES_MAX_LIMIT,
+        default=settings.TOP_TITLES_LIMIT,
+    )
+
+
+class TitleIdsParamsSerializer(Serializer):
+    """Список id произведений через запятую: ?ids=1,2,3."""
+
+    ids = CharField()
+
+    def validate_ids(self, value):
+        try:
+            ids = list(dict.fromkeys(
+                int(title_id) for title_id in value.split(',')
+            ))
+        except ValueError:
+            raise ValidationError('Укажите id произведений через запятую.')
+        if len(ids) > settings.RATING_DISTRIBUTION_MAX_IDS:
+            raise ValidationError(
+                'Не больше '
+                f'{settings.RATING_DISTRIBUTION_MAX_IDS} произведений.'
+            )
+        return ids
+
+
+class TitleBulkListSerializer(ListSerializer):
+    """Создание произведений пачкой за фиксированное число запросов.
+
+    Slug'и жанров и категорий всех произведений разрешаются двумя
+    запросами, произведения и связи с жанрами создаются bulk_create.
+    Ошибки возвращаются списком, по элементу на каждое произведение.
+    """
+
+    def check_list(self, data):
+        if not isinstance(data, list):
+            message = self.error_messages['not_a_list'].format(
+                input_type=type(data).__name__
+            )
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [message]},
+                code='not_a_list',
+            )
+        max_size = settings.TITLES_BULK_MAX_SIZE
+        if len(data) > max_size:
+            raise ValidationError({
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    'За один запрос можно создать не более '
+                    f'{max_size} произведений.'
+                ]
+            })
+
+    def run_child_validation(self, data):
+        """Валидирует элементы; для ошибочных элемент равен None."""
+        items = []
+        errors = []
+        for item in data:
+            try:
+                items.append(self.child.run_validation(item))
+                errors.append({})
+            except ValidationError as exc:
+                items.append(None)
+                errors.append(exc.detail)
+        return items, errors
+
+    @staticmethod
+    def resolve_slugs(items):
+        """Жанры и категории всех элементов двумя запросами."""
+        valid_items = [item for item in items if item is not None]
+        genres = Genre.objects.in_bulk(
+            {slug for item in valid_items for slug in item['genre']},
+            field_name='slug',
+        )
+        categories = Category.objects.in_bulk(
+            {item['category'] for item in valid_items}, field_name='slug'
+        )
+        return genres, categories
+
+    @staticmethod
+    def get_slug_errors(item, genres, categories):
+        errors = {}
+        missing = [slug for slug in item['genre'] if slug not in genres]
+        if missing:
+            errors['genre'] = [
+                f'Жанр со slug={slug} не существует.' for slug in missing
+            ]
+        if item['category'] not in categories:
+            errors['category'] = [
+                f'Категория со slug={item["category"]} не существует.'
+            ]
+        return errors
+
+    def to_internal_value(self, data):
+        self.check_list(data)
+        items, errors = self.run_child_validation(data)
+        genres, categories = self.resolve_slugs(items)
+        for item, item_errors in zip(items, errors):
+            if item is not None:
+                item_errors.update(
+                    self.get_slug_errors(item, genres, categories)
+                )
+        if any(errors):
+            raise ValidationError(errors)
+
+        for item in items:
+            item['genre'] = [
+                genres[slug] for slug in dict.fromkeys(item['genre'])
+            ]
+            item['category'] = categories[item['category']]
+        return items
+
+    def create(self, validated_data):
+        titles = []
+        for item in validated_data:
+            title = Title(
+                name=item['name'],
+                year=item['year'],
+                description=item.get('description', ''),
+                category=item['category'],
+            )
+            title.fill_normalized_fields()
+            titles.append(title)
+
+        with transaction.atomic():
+            Title.objects.bulk_create(titles)
+            if titles and titles[0].pk is None:
+                # SQLite не возвращает id из bulk_create. Блокировка
+                # на запись держится до конца транзакции, поэтому
+                # последние id принадлежат только что созданным строкам.
+                ids = list(
+                    Title.objects.order_by('-id').values_list(
+                        'id', flat=True
+                    )[:len(titles)]
+                )
+                for title, pk in zip(titles, reversed(ids)):
+                    title.pk = pk
+            TitleGenre.objects.bulk_create(
+                TitleGenre(title_id=title.pk, genre_id=genre.pk)
+                for title, item in zip(titles, validated_data)
+                for genre in item['genre']
+            )
+        prefetch_related_objects(titles, 'genre')
+        return titles
+
+
+class TitleBulkSerializer(ModelSerializer):
+    """Произведение в запросе на массовое создание."""
+
+    genre = ListField(child=SlugField())
+    category = SlugField()
+
+    class Meta:
+        model = Title
+        fields = ('name', 'description', 'year', 'category', 'genre')
+        list_serializer_class = TitleBulkListSerializer
+
+    def to_representation(self, instance):
+        return TitleReadSerializer(instance).data
+
+
+class ReviewSerializer(SparseFieldsMixin, ModelSerializer):
     """Вывод списка отзывов."""
 
     author = SlugRelatedField(
@@ -93,19 +400,34 @@ class ReviewSerializer(ModelSerializer):
     )
 
     class Meta:
-        fields = ('id', 'text', 'author', 'score', 'pub_date')
+        fields = (
+            'id',
+            'text',
+            'author',
+            'score',
+            'pub_date',
+            'comments_count',
+        )
         model = Review
 
-    def validate(self, data):
-        request = self.context['request']
-        if request.method == 'POST':
-            title_id = self.context['view'].kwargs.get('title_id')
-            title = get_object_or_404(Title, id=title_id)
-            if Review.objects.filter(
-                author=request.user, title=title
+    def create(self, validated_data):
+        """Повторный отзыв отсекает ограничение unique_author_title.
+
+        Проверка до INSERT требовала бы лишнего запроса и не защищала
+        от одновременных запросов. Review.save выполняется в atomic,
+        поэтому после ошибки транзакция запроса остаётся рабочей.
+        """
+        try:
+            return super().create(validated_data)
+        except IntegrityError:
+            if not Review.objects.filter(
+                author=validated_data['author'],
+                title=validated_data['title'],
             ).exists():
-                raise ValidationError('Можно оставить только один отзыв!')
-        return data
+                raise
+            raise ValidationError({api_settings.NON_FIELD_ERRORS_KEY: [
+                'Можно оставить только один отзыв!'
+            ]})
 
 
 class CommentSerializer(ModelSerializer):
@@ -118,7 +440,59 @@ class CommentSerializer(ModelSerializer):
         fields = ('id', 'text', 'author', 'pub_date')
 
 
-class UserSerializer(ModelSerializer):
+class ReviewWithCommentsSerializer(ReviewSerializer):
+    """Отзыв с последними комментариями (?include=comments)."""
+
+    comments = CommentSerializer(
+        many=True, read_only=True, source='latest_comments'
+    )
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('comments',)
+
+
+class TitleWithReviewsSerializer(TitleReadSerializer):
+    """Произведение с последними отзывами (?include=reviews).
+
+    Автор отзыва выводится только при ?include=reviews.author.
+    """
+
+    reviews = ReviewSerializer(
+        many=True, read_only=True, source='latest_reviews'
+    )
+
+    class Meta(TitleReadSerializer.Meta):
+        fields = TitleReadSerializer.Meta.fields + ('reviews',)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        reviews = self.fields.get('reviews')
+        if reviews and 'reviews.author' not in self.context.get('include', ()):
+            reviews.child.fields.pop('author')
+
+
+class UserReviewSerializer(ReviewSerializer):
+    """Отзыв в ленте пользователя: с id произведения."""
+
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
+        read_only_fields = ('title',)
+
+
+class UserCommentSerializer(CommentSerializer):
+    """Комментарий в ленте пользователя: с id отзыва и произведения.
+
+    title берётся из аннотации запроса, без загрузки отзыва.
+    """
+
+    title = IntegerField(read_only=True)
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ('review', 'title')
+        read_only_fields = ('review',)
+
+
+class UserSerializer(SparseFieldsMixin, ModelSerializer):
     """Вывод данных пользователя"""
 
     class Meta:
@@ -162,3 +536,22 @@ class GetTokenSerializer(Serializer):
         validators=[validate_username, username_validator],
     )
     confirmation_code = CharField()
+
+
+class DeletionTaskSerializer(ModelSerializer):
+    """Ход фонового удаления."""
+
+    progress = FloatField(read_only=True)
+
+    class Meta:
+        model = DeletionTask
+        fields = (
+            'id',
+            'target',
+            'object_id',
+            'total',
+            'deleted',
+            'progress',
+            'created_at',
+            'finished_at',
+        )
@@ -0,0 +1,63 @@
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_migrate,
+    post_save,
+)
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from .cache import bump_versions
+
+User = get_user_model()
+
+# Шаблоны коллекций, которые меняет запись модели;
+# подставляются значения полей изменённого объекта.
+MODEL_COLLECTIONS = {
+    Title: ('title', 'title:{id}'),
+    Genre: ('genre',),
+    Category: ('category',),
+    Review: ('review', 'review:title:{title_id}', 'review:{id}'),
+    Comment: ('comment', 'comment:review:{review_id}'),
+    User: ('user',),
+}
+
+
+def bump_on_commit(collections):
+    transaction.on_commit(lambda: bump_versions(collections))
+
+
+def bump_model_collections(sender, instance, **kwargs):
+    bump_on_commit([
+        collection.format(**vars(instance))
+        for collection in MODEL_COLLECTIONS[sender]
+    ])
+
+
+def bump_title_genres(sender, instance, action, reverse, pk_set, **kwargs):
+    if not action.startswith('post_'):
+        return
+    if not reverse:
+        bump_model_collections(Title, instance)
+        return
+    bump_on_commit(['title', *(f'title:{pk}' for pk in pk_set or ())])
+
+
+def bump_all_collections(sender, **kwargs):
+    """После migrate и flush данные в базе не совпадают с кешем."""
+    bump_versions([
+        collections[0] for collections in MODEL_COLLECTIONS.values()
+    ])
+
+
+def connect_signals():
+    for model in MODEL_COLLECTIONS:
+        post_save.connect(bump_model_collections, sender=model)
+        post_delete.connect(bump_model_collections, sender=model)
+    m2m_changed.connect(bump_title_genres, sender=Title.genre.through)
+    # post_migrate не отправляется для приложений без моделей, как api.
+    post_migrate.connect(
+        bump_all_collections, sender=apps.get_app_config('reviews')
+    )
@@ -3,10 +3,13 @@ from rest_framework import routers
 
 from .views import (
     CategoryViewSet,
+    DeletionTaskViewSet,
     GenreViewSet,
     TitleViewSet,
     ReviewViewSet,
     UserViewSet,
+    UserCommentViewSet,
+    UserReviewViewSet,
     CommentViewSet,
     SignupView,
     GetTokenView,
@@ -20,6 +23,21 @@ router_review_v1.register(
     UserViewSet,
     basename='user',
 )
+router_review_v1.register(
+    r'users/(?P<username>[\w.@+-]+)/reviews',
+    UserReviewViewSet,
+    basename='user-review',
+)
+router_review_v1.register(
+    r'users/(?P<username>[\w.@+-]+)/comments',
+    UserCommentViewSet,
+    basename='user-comment',
+)
+router_review_v1.register(
+    'deletions',
+    DeletionTaskViewSet,
+    basename='deletion',
+)
 router_review_v1.register('categories', CategoryViewSet, basename='category')
 router_review_v1.register('genres', GenreViewSet, basename='genre')
 router_review_v1.register('titles', TitleViewSet, basename='title')
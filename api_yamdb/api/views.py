@@ -1,34 +1,78 @@
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.contrib.auth.tokens import default_token_generator
-from django.db.models import Avg
+from django.db.models import F, Prefetch
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework import filters, status
+from rest_framework import mixins, status
 from rest_framework.decorators import action
-from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.exceptions import NotFound
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import (
+    GenericViewSet,
+    ModelViewSet,
+    ReadOnlyModelViewSet,
+)
 from rest_framework_simplejwt.tokens import AccessToken
 
+from reviews.deletion import delete_or_schedule
 from reviews.models import (
     Category,
+    Comment,
+    DeletionTask,
     Genre,
-    Title,
     Review,
+    Title,
 )
+from reviews.utils import get_rating_distributions, get_top_titles
 from users.utils import send_confirmation_code_to_email
-from .filters import TitleFilter
-from .mixins import CreateDestiyListModelMixin
-from .permissions import IsAdminOrReadOnly, IsAdmin, IsAuthenticatedOrReadOnly
+from .cache import (
+    CachedResponseMixin,
+    ConditionalGetMixin,
+    get_cache_stats,
+)
+from .filters import (
+    NormalizedSearchFilter,
+    StrictOrderingFilter,
+    TitleFilter,
+)
+from .mixins import (
+    CreateDestiyListModelMixin,
+    FacetsMixin,
+    IncludeMixin,
+    SparseFieldsQuerysetMixin,
+    ValuesListMixin,
+)
+from .pagination import (
+    CursorOrLimitOffsetPagination,
+    CursorOrPageNumberPagination,
+    ViewCursorPagination,
+)
+from .permissions import (
+    IsAdminOrReadOnly,
+    IsAdmin,
+    IsAuthenticatedOrReadOnly,
+    IsProfileOwnerOrModerator,
+)
+from .signals import bump_on_commit
 from .serializers import (
     CategorySerializer,
+    DeletionTaskSerializer,
     GenreSerializer,
+    TitleBulkSerializer,
     TitleWriteSerializer,
     TitleReadSerializer,
+    TitleIdsParamsSerializer,
+    TitleValuesReader,
+    TitleWithReviewsSerializer,
+    TopTitlesParamsSerializer,
     ReviewSerializer,
+    ReviewWithCommentsSerializer,
     CommentSerializer,
+    UserCommentSerializer,
+    UserReviewSerializer,
     UserSerializer,
     UsersMeSerializer,
 )
@@ -50,6 +94,7 @@ class CategoryViewSet(CreateDestiyListModelMixin):
 
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    cache_collections = ('category',)
 
 
 class GenreViewSet(CreateDestiyListModelMixin):
@@ -57,73 +102,292 @@ class GenreViewSet(CreateDestiyListModelMixin):
 
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
-
-
-class TitleViewSet(ModelViewSet):
+    cache_collections = ('genre',)
+
+
+class TitleViewSet(
+    IncludeMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    FacetsMixin,
+    ValuesListMixin,
+    SparseFieldsQuerysetMixin,
+    ModelViewSet,
+):
     """Вывод произведений."""
 
     permission_classes = (IsAdminOrReadOnly,)
-    queryset = Title.objects.annotate(rating=Avg('reviews__score')).all()
-    pagination_class = LimitOffsetPagination
-    filter_backends = (DjangoFilterBackend,)
+    queryset = Title.objects.filter(is_deleted=False)
+    serializer_class = TitleReadSerializer
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('id',)
+    lookup_value_regex = r'\d+'
+    filter_backends = (DjangoFilterBackend, StrictOrderingFilter)
     filterset_class = TitleFilter
+    ordering_fields = ('rating', 'weighted_rating', 'year', 'name', 'id')
     http_method_names = APPLY_METHODS
+    cache_collections = ('title', 'genre', 'category', 'review')
+    conditional_actions = (
+        'list',
+        'retrieve',
+        'top',
+        'rating_distribution',
+        'rating_distributions',
+    )
+    values_reader_class = TitleValuesReader
+    facet_fields = {
+        'genre': {'slug': 'genre__slug', 'name': 'genre__name'},
+        'category': {'slug': 'category__slug', 'name': 'category__name'},
+        'year': {'value': 'year'},
+    }
+    sparse_model_fields = {
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+        'reviews': (),
+    }
+    include_relations = {
+        'reviews': {
+            'queryset': Review.objects.filter(author__is_deleted=False),
+            'parent_field': 'title',
+            'to_attr': 'latest_reviews',
+            'limit_param': 'reviews_limit',
+            'default_limit': settings.TITLE_REVIEWS_LIMIT,
+            'max_limit': settings.TITLE_REVIEWS_MAX_LIMIT,
+            # Отзывы выводят количество комментариев, а удаление автора
+            # их скрывает.
+            'cache_collections': ('comment', 'user'),
+        },
+        'reviews.author': {'cache_collections': ('user',)},
+    }
+    include_serializer_class = TitleWithReviewsSerializer
+
+    def get_queryset(self):
+        requested = self.get_requested_fields()
+        queryset = super().get_queryset()
+        if requested is None or 'category' in requested:
+            queryset = queryset.select_related('category')
+        if requested is None or 'genre' in requested:
+            queryset = queryset.prefetch_related(
+                Prefetch('genre', queryset=Genre.objects.order_by('slug'))
+            )
+        return self.prune_queryset(queryset, requested)
 
     def get_serializer_class(self):
         if self.action in ['create', 'update', 'partial_update']:
             return TitleWriteSerializer
-        return TitleReadSerializer
+        return super().get_serializer_class()
+
+    def get_values_reader_class(self):
+        # Встроенные объекты собирает сериализатор.
+        if self.get_include_paths():
+            return None
+        return super().get_values_reader_class()
+
+    def perform_destroy(self, instance):
+        delete_or_schedule(instance, DeletionTask.Target.TITLE)
+
+    @action(detail=False, methods=('post',))
+    def bulk(self, request):
+        """Создание списка произведений за фиксированное число запросов."""
+        serializer = TitleBulkSerializer(data=request.data, many=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        # bulk_create не отправляет сигналы post_save и m2m_changed.
+        bump_on_commit(('title',))
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=False)
+    def top(self, request):
+        """Лучшие по рейтингу произведения, не сортируя весь каталог."""
+        return self.get_cached_response(self.get_top, request)
+
+    def get_top(self, request):
+        params = TopTitlesParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        titles = get_top_titles(
+            self.get_queryset(),
+            category=params.validated_data.get('category'),
+            genre=params.validated_data.get('genre'),
+        )[:params.validated_data['limit']]
+        serializer = self.get_serializer(titles, many=True)
+        return Response(serializer.data)
+
+    @action(detail=True, url_path='rating-distribution')
+    def rating_distribution(self, request, pk=None):
+        """Количество отзывов с каждой оценкой у произведения."""
+        return self.get_cached_response(
+            self.get_rating_distributions,
+            request,
+            ids=[int(pk)],
+            detail=True,
+        )
+
+    @action(
+        detail=False,
+        url_path='rating-distribution',
+        url_name='rating-distributions',
+    )
+    def rating_distributions(self, request):
+        """Распределения оценок для нескольких произведений: ?ids=1,2."""
+        params = TitleIdsParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return self.get_cached_response(
+            self.get_rating_distributions,
+            request,
+            ids=params.validated_data['ids'],
+        )
+
+    def get_rating_distributions(self, request, ids, detail=False):
+        titles = self.queryset.filter(pk__in=ids).values_list(
+            'id', 'reviews_count'
+        )
+        if detail and not titles:
+            raise NotFound()
+        reviews_counts = dict(titles)
+        distributions = get_rating_distributions(reviews_counts)
+        data = [
+            {
+                'id': title_id,
+                'reviews_count': reviews_counts[title_id],
+                'distribution': distributions[title_id],
+            }
+            for title_id in ids
+            if title_id in reviews_counts
+        ]
+        return Response(data[0] if detail else data)
+
+    @action(
+        detail=False,
+        url_path='cache-stats',
+        permission_classes=(IsAdmin,),
+    )
+    def cache_stats(self, request):
+        """Счётчики попаданий и промахов кеша ответов."""
+        return Response(get_cache_stats(), status=status.HTTP_200_OK)
 
 
-class ReviewViewSet(ModelViewSet):
+class ReviewViewSet(
+    IncludeMixin,
+    ConditionalGetMixin,
+    SparseFieldsQuerysetMixin,
+    ModelViewSet,
+):
     """Вывод отзывов."""
 
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-pub_date', '-id')
     http_method_names = APPLY_METHODS
+    # comments_count отзыва меняется с каждым комментарием.
+    cache_collections = (
+        'review:title:{title_id}',
+        'title:{title_id}',
+        'comment',
+        'user',
+    )
+    sparse_model_fields = {
+        'author': ('author', 'author__username'),
+        'comments': (),
+    }
+    include_relations = {
+        'comments': {
+            'queryset': Comment.objects.filter(
+                author__is_deleted=False
+            ).select_related('author'),
+            'parent_field': 'review',
+            'to_attr': 'latest_comments',
+            'limit_param': 'comments_limit',
+            'default_limit': settings.REVIEW_COMMENTS_LIMIT,
+            'max_limit': settings.REVIEW_COMMENTS_MAX_LIMIT,
+        },
+    }
+    include_serializer_class = ReviewWithCommentsSerializer
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs.get('title_id'))
+        """Произведение из URL; загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.only('id'),
+                id=self.kwargs.get('title_id'),
+                is_deleted=False,
+            )
+        return self._title
 
     def get_queryset(self):
-        return self.get_title().reviews.all()
+        requested = self.get_requested_fields()
+        # Не через related manager: он читает title_id каждой строки,
+        # а при ?fields= это поле отложено и стоило бы запроса на строку.
+        queryset = Review.objects.filter(
+            title_id=self.get_title().id, author__is_deleted=False
+        )
+        if requested is None or 'author' in requested:
+            queryset = queryset.select_related('author')
+        return self.prune_queryset(queryset, requested)
 
     def perform_create(self, serializer):
-        title = self.get_title()
-        serializer.save(author=self.request.user, title=title)
+        serializer.save(author=self.request.user, title=self.get_title())
 
 
-class CommentViewSet(ModelViewSet):
+class CommentViewSet(ConditionalGetMixin, ModelViewSet):
     """Вывод комментариев."""
 
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
+    pagination_class = CursorOrPageNumberPagination
+    cursor_ordering = ('-pub_date', '-id')
     http_method_names = APPLY_METHODS
+    cache_collections = (
+        'comment:review:{review_id}',
+        'review:{review_id}',
+        # Удаление произведения скрывает его отзывы и комментарии.
+        'title:{title_id}',
+        'user',
+    )
 
     def get_review(self):
-        return get_object_or_404(
-            Review,
-            title_id=self.kwargs.get('title_id'),
-            id=self.kwargs.get('review_id'),
-        )
+        """Отзыв из URL; условие по title_id заодно проверяет произведение.
+
+        Загружается одним запросом и один раз за запрос.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.only('id', 'title_id'),
+                title_id=self.kwargs.get('title_id'),
+                id=self.kwargs.get('review_id'),
+                title__is_deleted=False,
+                author__is_deleted=False,
+            )
+        return self._review
 
     def get_queryset(self):
-        return self.get_review().comments.all()
+        return Comment.objects.filter(
+            review_id=self.get_review().id, author__is_deleted=False
+        ).select_related('author')
 
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
 
 
-class UserViewSet(ModelViewSet):
-    queryset = User.objects.all()
+class UserViewSet(SparseFieldsQuerysetMixin, ModelViewSet):
+    queryset = User.objects.filter(is_deleted=False)
     serializer_class = UserSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('id',)
     permission_classes = (IsAdmin,)
     http_method_names = APPLY_METHODS
-    filter_backends = (filters.SearchFilter,)
-    search_fields = ('username',)
+    filter_backends = (NormalizedSearchFilter,)
+    search_fields = ('username_normalized',)
     lookup_field = 'username'
 
+    def get_queryset(self):
+        return self.prune_queryset(
+            super().get_queryset(), self.get_requested_fields()
+        )
+
+    def perform_destroy(self, instance):
+        delete_or_schedule(instance, DeletionTask.Target.USER)
+
     @action(
         detail=False,
         methods=('get', 'patch'),
@@ -139,6 +403,72 @@ class UserViewSet(ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class AuthorTimelineViewSet(mixins.ListModelMixin, GenericViewSet):
+    """Лента отзывов или комментариев пользователя из URL.
+
+    Строки читаются по индексу (author, pub_date) курсорной пагинацией
+    без COUNT, поэтому число запросов и прочитанных строк не зависит от
+    того, сколько записей у автора.
+    """
+
+    permission_classes = (IsProfileOwnerOrModerator,)
+    pagination_class = ViewCursorPagination
+    cursor_ordering = ('-pub_date', '-id')
+
+    def get_author(self):
+        """Пользователь из URL; для me и своего username - без запроса."""
+        if not hasattr(self, '_author'):
+            username = self.kwargs.get('username')
+            if username in ('me', self.request.user.username):
+                self._author = self.request.user
+            else:
+                self._author = get_object_or_404(
+                    User.objects.only('id'),
+                    username=username,
+                    is_deleted=False,
+                )
+        return self._author
+
+
+class UserReviewViewSet(SparseFieldsQuerysetMixin, AuthorTimelineViewSet):
+    """Вывод отзывов пользователя."""
+
+    serializer_class = UserReviewSerializer
+    sparse_model_fields = {'author': ('author', 'author__username')}
+
+    def get_queryset(self):
+        requested = self.get_requested_fields()
+        queryset = Review.objects.filter(
+            author_id=self.get_author().id, title__is_deleted=False
+        )
+        if requested is None or 'author' in requested:
+            queryset = queryset.select_related('author')
+        return self.prune_queryset(queryset, requested)
+
+
+class UserCommentViewSet(AuthorTimelineViewSet):
+    """Вывод комментариев пользователя."""
+
+    serializer_class = UserCommentSerializer
+
+    def get_queryset(self):
+        return Comment.objects.filter(
+            author_id=self.get_author().id,
+            review__title__is_deleted=False,
+            review__author__is_deleted=False,
+        ).select_related('author').annotate(title=F('review__title_id'))
+
+
+class DeletionTaskViewSet(ReadOnlyModelViewSet):
+    """Ход фонового удаления произведений и пользователей."""
+
+    queryset = DeletionTask.objects.all()
+    serializer_class = DeletionTaskSerializer
+    permission_classes = (IsAdmin,)
+    pagination_class = CursorOrLimitOffsetPagination
+    cursor_ordering = ('id',)
+
+
 class SignupView(APIView):
     """Регистрация пользователя.
 
@@ -165,6 +495,11 @@ class SignupView(APIView):
                     errors['username'] = [
                         'Пользователь с таким username уже существует.']
                 return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+            if user_by_username.is_deleted:
+                return Response(
+                    {'username': ['Пользователь удаляется.']},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
 
         user, _ = User.objects.get_or_create(username=username, email=email)
         send_confirmation_code_to_email(user.email, user)
@@ -180,7 +515,7 @@ class GetTokenView(APIView):
         serializer.is_valid(raise_exception=True)
         username = serializer.validated_data.get('username')
         confirmation_code = serializer.validated_data.get('confirmation_code')
-        user = get_object_or_404(User, username=username)
+        user = get_object_or_404(User, username=username, is_deleted=False)
 
         if not default_token_generator.check_token(user, confirmation_code):
             message = {'confirmation_code': 'Код подтверждения невалиден'}
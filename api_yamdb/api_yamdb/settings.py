@@ -77,6 +77,18 @@ DATABASES = {
     }
 }
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
+    }
+}
+
+# Кеш ответов API и версий коллекций. При нескольких процессах
+# приложения нужен общий для всех процессов бэкенд (Redis, Memcached).
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = 300
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -120,3 +132,18 @@ SCORE_MAX_LIMIT_VALUE = 10
 USERNAME_MAX_LENGHT = 150
 EMAIL_MAX_LENGHT = 254
 ROLE_MAX_LENGHT = 20
+TITLES_BULK_MAX_SIZE = 1000
+TOP_TITLES_MIN_REVIEWS = 3
+TOP_TITLES_LIMIT = 10
+TOP_TITLES_MAX_LIMIT = 100
+WEIGHTED_RATING_PRIOR_COUNT = 5
+WEIGHTED_RATING_MEAN_DRIFT = 0.1
+RATING_DISTRIBUTION_MAX_IDS = 100
+REVIEW_COMMENTS_LIMIT = 3
+REVIEW_COMMENTS_MAX_LIMIT = 20
+TITLE_REVIEWS_LIMIT = 3
+TITLE_REVIEWS_MAX_LIMIT = 20
+PREFETCH_PARENTS_BATCH_SIZE = 100
+DELETION_BACKGROUND_THRESHOLD = 1000
+DELETION_CHUNK_SIZE = 500
+DELETION_CHUNK_PAUSE = 0.1
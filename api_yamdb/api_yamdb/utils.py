@@ -0,0 +1,38 @@
+import unicodedata
+
+
+def normalize_text(value):
+    """Приводит строку к виду для поиска без учёта регистра.
+
+    В отличие от lower() в SQLite, casefold() корректно работает
+    с кириллицей и другими не-ASCII алфавитами.
+    """
+    return unicodedata.normalize('NFKC', value or '').casefold()
+
+
+class NormalizedFieldsMixin:
+    """Заполняет поля с нормализованным текстом перед сохранением модели.
+
+    normalized_fields: словарь {нормализованное поле: исходное поле}.
+    """
+
+    normalized_fields = {}
+
+    def fill_normalized_fields(self):
+        """Заполняет нормализованные поля.
+
+        bulk_create не вызывает save(), поэтому перед ним метод
+        вызывают явно.
+        """
+        for target, source in self.normalized_fields.items():
+            setattr(self, target, normalize_text(getattr(self, source)))
+
+    def save(self, *args, **kwargs):
+        self.fill_normalized_fields()
+        update_fields = kwargs.get('update_fields')
+        for target, source in self.normalized_fields.items():
+            if update_fields is not None and source in update_fields:
+                update_fields = {*update_fields, target}
+        if update_fields is not None:
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
@@ -0,0 +1,99 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.utils import timezone
+
+from api_yamdb import settings
+from .models import Comment, DeletionTask, Review, Title
+
+User = get_user_model()
+
+
+def get_title_stages(title_id):
+    """Строки, которые удаляются пачками перед произведением.
+
+    Оценки и связи с жанрами - не больше десятка строк на
+    произведение, они уходят каскадом вместе с ним.
+    """
+    return (
+        Comment.objects.filter(review__title_id=title_id),
+        Review.objects.filter(title_id=title_id),
+    )
+
+
+def get_user_stages(user_id):
+    """Строки, которые удаляются пачками перед пользователем."""
+    return (
+        Comment.objects.filter(author_id=user_id),
+        Comment.objects.filter(review__author_id=user_id),
+        Review.objects.filter(author_id=user_id),
+    )
+
+
+TARGETS = {
+    DeletionTask.Target.TITLE: (Title, get_title_stages),
+    DeletionTask.Target.USER: (User, get_user_stages),
+}
+
+
+def count_cascade(target, object_id):
+    """Оценка числа удаляемых строк по счётчикам комментариев отзывов."""
+    if target == DeletionTask.Target.TITLE:
+        reviews = Review.objects.filter(title_id=object_id)
+        own_comments = 0
+    else:
+        reviews = Review.objects.filter(author_id=object_id)
+        own_comments = Comment.objects.filter(author_id=object_id).count()
+    totals = reviews.aggregate(
+        reviews=Count('id'), comments=Sum('comments_count')
+    )
+    return 1 + totals['reviews'] + (totals['comments'] or 0) + own_comments
+
+
+def delete_or_schedule(instance, target):
+    """Удаляет объект или, если каскад велик, ставит задачу удаления.
+
+    Объект с каскадом больше DELETION_BACKGROUND_THRESHOLD строк сразу
+    скрывается флагом is_deleted (пользователь ещё и теряет доступ),
+    а строки удаляет purge_deletions. Возвращает задачу или None.
+    """
+    total = count_cascade(target, instance.pk)
+    if total <= settings.DELETION_BACKGROUND_THRESHOLD:
+        instance.delete()
+        return None
+    update_fields = ['is_deleted']
+    instance.is_deleted = True
+    if target == DeletionTask.Target.USER:
+        instance.is_active = False
+        update_fields.append('is_active')
+    with transaction.atomic():
+        instance.save(update_fields=update_fields)
+        return DeletionTask.objects.create(
+            target=target, object_id=instance.pk, total=total
+        )
+
+
+def purge_chunk(task, chunk_size):
+    """Удаляет одну пачку строк задачи в отдельной транзакции.
+
+    Пачки идут по этапам каскада, последним удаляется сам объект;
+    после него задача отмечается завершённой. Короткие транзакции
+    не держат блокировку записи дольше одной пачки.
+    """
+    model, get_stages = TARGETS[task.target]
+    with transaction.atomic():
+        for stage in get_stages(task.object_id):
+            ids = list(
+                stage.order_by().values_list('pk', flat=True)[:chunk_size]
+            )
+            if ids:
+                deleted, _ = stage.model.objects.filter(pk__in=ids).delete()
+                break
+        else:
+            deleted, _ = model.objects.filter(
+                pk=task.object_id, is_deleted=True
+            ).delete()
+            task.finished_at = timezone.now()
+        task.deleted += deleted
+        task.save(update_fields=('deleted', 'finished_at'))
+    return deleted
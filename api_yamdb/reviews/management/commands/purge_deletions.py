@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api_yamdb import settings
+from reviews.deletion import purge_chunk
+from reviews.models import DeletionTask
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет пачками произведения и пользователей, скрытые при '
+        'удалении через API, вместе с их отзывами и комментариями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=settings.DELETION_CHUNK_SIZE,
+            help='Количество строк, удаляемых в одной транзакции.',
+        )
+        parser.add_argument(
+            '--pause',
+            type=float,
+            default=settings.DELETION_CHUNK_PAUSE,
+            help='Пауза между пачками в секундах для других запросов.',
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options['chunk_size']
+        pause = options['pause']
+        tasks = DeletionTask.objects.filter(finished_at__isnull=True)
+        finished = 0
+        for task in tasks:
+            while task.finished_at is None:
+                purge_chunk(task, chunk_size)
+                self.stdout.write(
+                    f'{task}: удалено {task.deleted} из ~{task.total} '
+                    f'({task.progress:.0%})'
+                )
+                if pause and task.finished_at is None:
+                    time.sleep(pause)
+            finished += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Завершено задач удаления: {finished}.')
+        )
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import Review, Title
+from reviews.utils import (
+    rebuild_comments_counts,
+    rebuild_rating_stats,
+    rebuild_score_counts,
+    rebuild_title_ratings,
+    update_weighted_mean,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает общую статистику оценок, затем пачками рейтинги, '
+        'счётчики отзывов и распределение оценок произведений и счётчики '
+        'комментариев их отзывов.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений, обновляемых в одной транзакции.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        rebuild_rating_stats()
+        update_weighted_mean()
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                Title.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            titles = Title.objects.filter(id__gte=ids[0], id__lte=ids[-1])
+            with transaction.atomic():
+                updated += rebuild_title_ratings(titles)
+                rebuild_score_counts(titles)
+                rebuild_comments_counts(
+                    Review.objects.filter(title__in=titles)
+                )
+            last_id = ids[-1]
+            self.stdout.write(f'Обработано произведений: {updated}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}.')
+        )
@@ -0,0 +1,55 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from reviews.models import RatingStats, Title
+from reviews.utils import rebuild_weighted_ratings, update_weighted_mean
+
+
+class Command(BaseCommand):
+    help = (
+        'Если средняя по всем отзывам ушла от опорной дальше '
+        'WEIGHTED_RATING_MEAN_DRIFT, делает её опорной и пачками '
+        'пересчитывает взвешенный рейтинг произведений.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Количество произведений, обновляемых в одной транзакции.',
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересчитать, даже если опорная средняя не устарела.',
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        stale = RatingStats.objects.filter(
+            pk=RatingStats.SINGLETON_ID, weighted_mean_stale=True
+        ).exists()
+        if not stale and not options['force']:
+            self.stdout.write('Опорная средняя не устарела.')
+            return
+        update_weighted_mean()
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                Title.objects.filter(id__gt=last_id)
+                .order_by('id')
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            with transaction.atomic():
+                updated += rebuild_weighted_ratings(
+                    Title.objects.filter(id__gte=ids[0], id__lte=ids[-1])
+                )
+            last_id = ids[-1]
+            self.stdout.write(f'Обработано произведений: {updated}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано произведений: {updated}.')
+        )
@@ -0,0 +1,57 @@
+# Generated by Django 3.2 on 2026-10-18 16:39
+
+from django.db import migrations, models
+from django.db.models import (
+    Avg, Count, FloatField, IntegerField, OuterRef, Subquery, Sum,
+)
+from django.db.models.functions import Coalesce
+
+
+def fill_rating_counters(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Review = apps.get_model('reviews', 'Review')
+    reviews = Review.objects.filter(
+        title_id=OuterRef('pk')
+    ).order_by().values('title_id')
+    Title.objects.update(
+        score_sum=Coalesce(
+            Subquery(reviews.annotate(value=Sum('score')).values('value')),
+            0,
+            output_field=IntegerField(),
+        ),
+        reviews_count=Coalesce(
+            Subquery(reviews.annotate(value=Count('id')).values('value')),
+            0,
+            output_field=IntegerField(),
+        ),
+        rating=Subquery(
+            reviews.annotate(value=Avg('score')).values('value'),
+            output_field=FloatField(),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_alter_review_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Рейтинг'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='reviews_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество отзывов'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='score_sum',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Сумма оценок'),
+        ),
+        migrations.RunPython(fill_rating_counters, migrations.RunPython.noop),
+    ]
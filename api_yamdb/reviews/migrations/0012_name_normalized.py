@@ -0,0 +1,45 @@
+# Generated by Django 3.2 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+from api_yamdb.utils import normalize_text
+
+
+def fill_normalized(apps, schema_editor):
+    for model_name in ('Category', 'Genre', 'Title'):
+        model = apps.get_model('reviews', model_name)
+        objects = list(model.objects.only('id', 'name'))
+        for obj in objects:
+            obj.name_normalized = normalize_text(obj.name)
+        model.objects.bulk_update(
+            objects, ('name_normalized',), batch_size=500
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_title_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='category',
+            name='name_normalized',
+            field=models.TextField(db_index=True, default='', editable=False, verbose_name='Название для поиска'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='name_normalized',
+            field=models.TextField(db_index=True, default='', editable=False, verbose_name='Название для поиска'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='name_normalized',
+            field=models.TextField(db_index=True, default='', editable=False, verbose_name='Название для поиска'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized, migrations.RunPython.noop),
+    ]
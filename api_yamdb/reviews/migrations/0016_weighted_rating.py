@@ -0,0 +1,58 @@
+# Generated by Django 3.2 on 2026-10-18 17:08
+
+from django.db import migrations, models
+from django.db.models import Count, F, FloatField, Sum, Value
+from django.db.models.functions import Cast, Coalesce
+
+# WEIGHTED_RATING_PRIOR_COUNT на момент миграции.
+PRIOR_COUNT = 5
+
+
+def fill_weighted_rating(apps, schema_editor):
+    Review = apps.get_model('reviews', 'Review')
+    RatingStats = apps.get_model('reviews', 'RatingStats')
+    Title = apps.get_model('reviews', 'Title')
+    totals = Review.objects.aggregate(
+        score_sum=Coalesce(Sum('score'), 0),
+        reviews_count=Count('id'),
+    )
+    RatingStats.objects.create(id=1, **totals)
+    if totals['reviews_count']:
+        mean = totals['score_sum'] / totals['reviews_count']
+        Title.objects.filter(reviews_count__gt=0).update(
+            weighted_rating=(
+                Cast(F('score_sum'), FloatField()) + Value(mean * PRIOR_COUNT)
+            ) / (F('reviews_count') + PRIOR_COUNT)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0015_title_category_rating_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RatingStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score_sum', models.PositiveBigIntegerField(default=0, verbose_name='Сумма оценок')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'статистика оценок',
+                'verbose_name_plural': 'Статистика оценок',
+            },
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='weighted_rating',
+            field=models.FloatField(editable=False, null=True, verbose_name='Взвешенный рейтинг'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['weighted_rating'], name='title_weighted_rating_idx'),
+        ),
+        migrations.RunPython(fill_weighted_rating, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 3.2 on 2026-10-18 18:05
+
+from django.db import migrations, models
+from django.db.models import F, FloatField, Value
+from django.db.models.functions import Cast
+
+# WEIGHTED_RATING_PRIOR_COUNT на момент миграции.
+PRIOR_COUNT = 5
+
+
+def fill_weighted_mean(apps, schema_editor):
+    """Пересчитывает взвешенный рейтинг всех произведений от одной средней."""
+    RatingStats = apps.get_model('reviews', 'RatingStats')
+    Title = apps.get_model('reviews', 'Title')
+    stats = RatingStats.objects.filter(reviews_count__gt=0).first()
+    if stats is None:
+        return
+    mean = stats.score_sum / stats.reviews_count
+    stats.weighted_mean = mean
+    stats.save(update_fields=('weighted_mean',))
+    Title.objects.filter(reviews_count__gt=0).update(
+        weighted_rating=(
+            Cast(F('score_sum'), FloatField()) + Value(mean * PRIOR_COUNT)
+        ) / (F('reviews_count') + PRIOR_COUNT)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0020_deletion_tasks'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ratingstats',
+            name='weighted_mean',
+            field=models.FloatField(editable=False, null=True, verbose_name='Средняя для взвешенного рейтинга'),
+        ),
+        migrations.RunPython(fill_weighted_mean, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 3.2 on 2026-10-18 18:31
+
+from django.db import migrations, models
+from django.db.models import F
+
+# TOP_TITLES_MIN_REVIEWS на момент миграции.
+MIN_REVIEWS = 3
+
+
+def fill_top_rating(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    Title.objects.filter(reviews_count__gte=MIN_REVIEWS).update(
+        top_rating=F('rating')
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0021_rating_stats_weighted_mean'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='title',
+            name='title_category_rating_idx',
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='top_rating',
+            field=models.FloatField(editable=False, help_text='NULL, пока отзывов меньше TOP_TITLES_MIN_REVIEWS.', null=True, verbose_name='Рейтинг для лучших произведений'),
+        ),
+        migrations.RunPython(fill_top_rating, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['top_rating'], name='title_top_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', 'top_rating'], name='title_category_top_rating_idx'),
+        ),
+    ]
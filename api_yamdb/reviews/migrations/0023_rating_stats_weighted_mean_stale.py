@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0022_title_top_rating'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ratingstats',
+            name='weighted_mean_stale',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Средняя для взвешенного рейтинга устарела'),
+        ),
+    ]
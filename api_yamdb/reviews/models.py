@@ -1,18 +1,48 @@
 from django.contrib.auth import get_user_model
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import models, transaction
 
 from api_yamdb import settings
+from api_yamdb.utils import NormalizedFieldsMixin
 from .validators import validate_year
 
 User = get_user_model()
 
 
-class Category(models.Model):
+class CounterFieldsMixin:
+    """Не перезаписывает при save() счётчики из COUNTER_FIELDS.
+
+    Счётчики меняют обработчики сигналов через F(); сохранение
+    загруженного ранее значения затёрло бы их изменения.
+    """
+
+    COUNTER_FIELDS = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            kwargs['update_fields'] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.COUNTER_FIELDS
+                and field.attname not in deferred
+            ]
+        super().save(*args, **kwargs)
+
+
+class Category(NormalizedFieldsMixin, models.Model):
+    normalized_fields = {'name_normalized': 'name'}
+
     name = models.CharField(
         'Название категории',
         max_length=settings.NAME_MAX_LENGHT,
     )
+    name_normalized = models.TextField(
+        'Название для поиска',
+        editable=False,
+        db_index=True,
+    )
     slug = models.SlugField(
         'Идентификатор',
         unique=True,
@@ -30,11 +60,18 @@ class Category(models.Model):
         return self.name
 
 
-class Genre(models.Model):
+class Genre(NormalizedFieldsMixin, models.Model):
+    normalized_fields = {'name_normalized': 'name'}
+
     name = models.CharField(
         'Название жанра',
         max_length=settings.NAME_MAX_LENGHT,
     )
+    name_normalized = models.TextField(
+        'Название для поиска',
+        editable=False,
+        db_index=True,
+    )
     slug = models.SlugField(
         'Идентификатор',
         unique=True,
@@ -52,11 +89,25 @@ class Genre(models.Model):
         return self.name
 
 
-class Title(models.Model):
+class Title(CounterFieldsMixin, NormalizedFieldsMixin, models.Model):
+    COUNTER_FIELDS = (
+        'reviews_count',
+        'score_sum',
+        'rating',
+        'top_rating',
+        'weighted_rating',
+    )
+    normalized_fields = {'name_normalized': 'name'}
+
     name = models.CharField(
         'Название произведения',
         max_length=settings.NAME_MAX_LENGHT,
     )
+    name_normalized = models.TextField(
+        'Название для поиска',
+        editable=False,
+        db_index=True,
+    )
     year = models.SmallIntegerField(
         'Год выпуска',
         validators=[validate_year],
@@ -65,24 +116,160 @@ class Title(models.Model):
         'Описание',
         blank=True,
     )
-    genre = models.ManyToManyField(Genre, verbose_name='Жанр')
+    genre = models.ManyToManyField(
+        Genre,
+        through='TitleGenre',
+        verbose_name='Жанр',
+    )
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
         null=True,
         verbose_name='Категория',
     )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+        editable=False,
+    )
+    score_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating = models.FloatField(
+        'Рейтинг',
+        null=True,
+        editable=False,
+    )
+    top_rating = models.FloatField(
+        'Рейтинг для лучших произведений',
+        null=True,
+        editable=False,
+        help_text='NULL, пока отзывов меньше TOP_TITLES_MIN_REVIEWS.',
+    )
+    weighted_rating = models.FloatField(
+        'Взвешенный рейтинг',
+        null=True,
+        editable=False,
+    )
+    is_deleted = models.BooleanField(
+        'Удалено',
+        default=False,
+        editable=False,
+        help_text='Скрыто из API и удаляется фоновой очисткой.',
+    )
 
     class Meta:
         default_related_name = 'titles'
         verbose_name = 'произведение'
         verbose_name_plural = 'Произведения'
+        indexes = (
+            models.Index(
+                fields=('category', 'year'),
+                name='title_category_year_idx',
+            ),
+            models.Index(fields=('year',), name='title_year_idx'),
+            models.Index(fields=('rating',), name='title_rating_idx'),
+            models.Index(fields=('name',), name='title_name_idx'),
+            models.Index(fields=('top_rating',), name='title_top_rating_idx'),
+            models.Index(
+                fields=('category', 'top_rating'),
+                name='title_category_top_rating_idx',
+            ),
+            models.Index(
+                fields=('weighted_rating',),
+                name='title_weighted_rating_idx',
+            ),
+        )
 
     def __str__(self):
         return self.name
 
 
-class Review(models.Model):
+class RatingStats(models.Model):
+    """Общие счётчики оценок по всем отзывам; в таблице одна строка.
+
+    weighted_mean - средняя, от которой посчитан взвешенный рейтинг
+    всех произведений; она меняется только вместе с пересчётом всех
+    произведений, поэтому их взвешенные рейтинги сравнимы.
+    weighted_mean_stale - текущая средняя ушла от неё дальше
+    WEIGHTED_RATING_MEAN_DRIFT и пересчёт ждёт refresh_weighted_ratings.
+    """
+
+    SINGLETON_ID = 1
+
+    score_sum = models.PositiveBigIntegerField('Сумма оценок', default=0)
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+    )
+    weighted_mean = models.FloatField(
+        'Средняя для взвешенного рейтинга',
+        null=True,
+        editable=False,
+    )
+    weighted_mean_stale = models.BooleanField(
+        'Средняя для взвешенного рейтинга устарела',
+        default=False,
+        editable=False,
+    )
+
+    class Meta:
+        verbose_name = 'статистика оценок'
+        verbose_name_plural = 'Статистика оценок'
+
+
+class ScoreCount(models.Model):
+    """Количество отзывов с данной оценкой у произведения.
+
+    На произведение не больше строк, чем возможных оценок; строки
+    обновляются обработчиками сигналов отзывов.
+    """
+
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='score_counts',
+    )
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество отзывов', default=0)
+
+    class Meta:
+        verbose_name = 'количество оценок'
+        verbose_name_plural = 'Количество оценок'
+        constraints = (
+            models.UniqueConstraint(
+                fields=('title', 'score'),
+                name='unique_title_score',
+            ),
+        )
+
+
+class TitleGenre(models.Model):
+    """Связь произведения с жанром.
+
+    Таблица та же, что создавал ManyToManyField; модель нужна только
+    для индекса по (genre, title) для фильтра по жанру.
+    """
+
+    title = models.ForeignKey(Title, on_delete=models.CASCADE)
+    genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
+
+    class Meta:
+        db_table = 'reviews_title_genre'
+        unique_together = (('title', 'genre'),)
+        indexes = (
+            models.Index(
+                fields=('genre', 'title'),
+                name='title_genre_genre_title_idx',
+            ),
+        )
+
+
+class Review(CounterFieldsMixin, models.Model):
+    COUNTER_FIELDS = ('comments_count',)
+
     title = models.ForeignKey(
         Title,
         on_delete=models.CASCADE,
@@ -117,6 +304,11 @@ class Review(models.Model):
         verbose_name='Дата публикации',
         auto_now_add=True,
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
 
     class Meta:
         constraints = [
@@ -127,11 +319,35 @@ class Review(models.Model):
         ]
         verbose_name = 'отзыв'
         verbose_name_plural = 'Отзывы'
-        ordering = ('-pub_date',)
+        # id в том же направлении, что и дата: весь порядок читается
+        # из индексов ниже (SQLite хранит rowid в конце индекса).
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date'),
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='review_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Запоминаем оценку из базы, чтобы при изменении учесть разницу."""
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Сохраняем отзыв и счётчики произведения в одной транзакции."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
 
 class Comment(models.Model):
     review = models.ForeignKey(
@@ -155,7 +371,64 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
-        ordering = ('-pub_date',)
+        ordering = ('-pub_date', '-id')
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date'),
+                name='comment_review_pub_date_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='comment_author_pub_date_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text
+
+    def save(self, *args, **kwargs):
+        """Сохраняем комментарий и счётчик отзыва в одной транзакции."""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
+
+class DeletionTask(models.Model):
+    """Фоновое удаление объекта с большим каскадом.
+
+    Объект сразу скрывается флагом is_deleted, а связанные строки
+    удаляются пачками командой purge_deletions; deleted и total
+    показывают ход удаления.
+    """
+
+    class Target(models.TextChoices):
+        TITLE = 'title'
+        USER = 'user'
+
+    target = models.CharField(
+        'Тип объекта',
+        max_length=16,
+        choices=Target.choices,
+    )
+    object_id = models.PositiveBigIntegerField('Id объекта')
+    total = models.PositiveIntegerField(
+        'Строк к удалению',
+        help_text='Оценка при постановке задачи.',
+    )
+    deleted = models.PositiveIntegerField('Удалено строк', default=0)
+    created_at = models.DateTimeField('Поставлена', auto_now_add=True)
+    finished_at = models.DateTimeField('Завершена', null=True, blank=True)
+
+    class Meta:
+        ordering = ('id',)
+        verbose_name = 'задача удаления'
+        verbose_name_plural = 'Задачи удаления'
+
+    def __str__(self):
+        return f'{self.target} {self.object_id}'
+
+    @property
+    def progress(self):
+        """Доля удалённых строк от 0 до 1."""
+        if self.finished_at is not None:
+            return 1.0
+        return min(self.deleted / self.total, 1.0) if self.total else 0.0
@@ -0,0 +1,174 @@
+"""Полнотекстовый поиск произведений на SQLite FTS5.
+
+Индексы хранятся в двух виртуальных таблицах с внешним содержимым
+(content='reviews_title'), их синхронизируют триггеры на reviews_title:
+- reviews_title_fts: name и description, токенизатор unicode61,
+  используется для ранжированного поиска по словам и их префиксам;
+- reviews_title_name_trigram: name, токенизатор trigram,
+  ускоряет поиск подстроки в названии (аналог icontains).
+"""
+import re
+import sqlite3
+from functools import lru_cache
+
+from django.db.models.expressions import RawSQL
+
+FTS_TABLE = 'reviews_title_fts'
+TRIGRAM_TABLE = 'reviews_title_name_trigram'
+TRIGRAM_MIN_LENGTH = 3
+NAME_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+INSTALL_SQL = (
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, description,
+        content='reviews_title', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {TRIGRAM_TABLE} USING fts5(
+        name,
+        content='reviews_title', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_title_search_insert
+    AFTER INSERT ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+        INSERT INTO {TRIGRAM_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_title_search_delete
+    AFTER DELETE ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, name)
+        VALUES ('delete', old.id, old.name);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS reviews_title_search_update
+    AFTER UPDATE OF name, description ON reviews_title BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, description)
+        VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {TRIGRAM_TABLE}({TRIGRAM_TABLE}, rowid, name)
+        VALUES ('delete', old.id, old.name);
+        INSERT INTO {FTS_TABLE}(rowid, name, description)
+        VALUES (new.id, new.name, new.description);
+        INSERT INTO {TRIGRAM_TABLE}(rowid, name) VALUES (new.id, new.name);
+    END
+    """,
+)
+TRIGGER_NAMES = (
+    'reviews_title_search_insert',
+    'reviews_title_search_delete',
+    'reviews_title_search_update',
+)
+
+
+@lru_cache(maxsize=None)
+def sqlite_supports_fts():
+    """Проверяет, что SQLite собран с FTS5 и токенизатором trigram."""
+    try:
+        with sqlite3.connect(':memory:') as connection:
+            connection.execute(
+                "CREATE VIRTUAL TABLE t USING fts5(a, tokenize='trigram')"
+            )
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+def is_search_available(connection):
+    return connection.vendor == 'sqlite' and sqlite_supports_fts()
+
+
+def install_title_search(connection):
+    """Создаёт индексы и триггеры, если их нет, и наполняет индексы."""
+    if not is_search_available(connection):
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COUNT(*) FROM sqlite_master '
+            "WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            TRIGGER_NAMES,
+        )
+        if cursor.fetchone()[0] == len(TRIGGER_NAMES):
+            return
+        for sql in INSTALL_SQL:
+            cursor.execute(sql)
+        for table in (FTS_TABLE, TRIGRAM_TABLE):
+            cursor.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+
+
+def restore_title_search(connection):
+    """Восстанавливает триггеры после миграций.
+
+    SQLite-миграции Django пересоздают таблицу reviews_title при изменении
+    её схемы, и триггеры удаляются вместе со старой таблицей. Если индексы
+    уже установлены миграцией, триггеры создаются заново, а индексы
+    перестраиваются.
+    """
+    if not is_search_available(connection):
+        return
+    if FTS_TABLE in connection.introspection.table_names():
+        install_title_search(connection)
+
+
+def uninstall_title_search(connection):
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        for trigger in TRIGGER_NAMES:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+        for table in (FTS_TABLE, TRIGRAM_TABLE):
+            cursor.execute(f'DROP TABLE IF EXISTS {table}')
+
+
+def quote_phrase(value):
+    return '"{}"'.format(value.replace('"', '""'))
+
+
+def get_search_expression(query):
+    """Превращает ввод пользователя в запрос FTS5 по префиксам слов."""
+    words = re.findall(r'\w+', query)
+    return ' '.join(f'{quote_phrase(word)}*' for word in words)
+
+
+def search_titles(queryset, query):
+    """Фильтрует произведения по словам запроса и сортирует по релевантности.
+
+    Возвращает None, если запрос не содержит слов.
+    """
+    expression = get_search_expression(query)
+    if not expression:
+        return None
+    match_sql = f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+    rank_sql = (
+        f'SELECT bm25({FTS_TABLE}, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}) '
+        f'FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+        f'AND rowid = {queryset.model._meta.db_table}.id'
+    )
+    return (
+        queryset.filter(id__in=RawSQL(match_sql, (expression,)))
+        .annotate(search_rank=RawSQL(rank_sql, (expression,)))
+        .order_by('search_rank', 'id')
+    )
+
+
+def filter_titles_by_name(queryset, value):
+    """Поиск подстроки в названии по триграммному индексу.
+
+    Возвращает None, если подстрока слишком короткая для индекса.
+    """
+    if len(value) < TRIGRAM_MIN_LENGTH:
+        return None
+    match_sql = (
+        f'SELECT rowid FROM {TRIGRAM_TABLE} WHERE {TRIGRAM_TABLE} MATCH %s'
+    )
+    return queryset.filter(id__in=RawSQL(match_sql, (quote_phrase(value),)))
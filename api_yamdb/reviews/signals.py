@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Comment, Review
+from .utils import (
+    change_comments_count,
+    change_score_count,
+    change_title_rating,
+)
+
+
+@receiver(post_save, sender=Review)
+def update_rating_on_review_save(sender, instance, created, **kwargs):
+    """Учитываем новую оценку или изменение существующей."""
+    score = int(instance.score)
+    if created:
+        change_title_rating(instance.title_id, score, 1)
+        change_score_count(instance.title_id, score, 1)
+    else:
+        old_score = getattr(instance, '_loaded_score', None)
+        if old_score is not None and old_score != score:
+            change_title_rating(instance.title_id, score - old_score, 0)
+            change_score_count(instance.title_id, old_score, -1)
+            change_score_count(instance.title_id, score, 1)
+    instance._loaded_score = score
+
+
+@receiver(post_delete, sender=Review)
+def update_rating_on_review_delete(sender, instance, **kwargs):
+    """Вычитаем оценку удалённого отзыва, в том числе при каскаде."""
+    change_title_rating(instance.title_id, -int(instance.score), -1)
+    change_score_count(instance.title_id, int(instance.score), -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_comments_count_on_save(sender, instance, created, **kwargs):
+    if created:
+        change_comments_count(instance.review_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def update_comments_count_on_delete(sender, instance, **kwargs):
+    """При каскаде от отзыва UPDATE не найдёт строку и ничего не сделает."""
+    change_comments_count(instance.review_id, -1)
@@ -0,0 +1,309 @@
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    FloatField,
+    IntegerField,
+    OuterRef,
+    Q,
+    Subquery,
+    Sum,
+    When,
+)
+from django.db.models.functions import Cast, Coalesce, NullIf
+
+from api_yamdb import settings
+from .models import (
+    Comment,
+    RatingStats,
+    Review,
+    ScoreCount,
+    Title,
+    TitleGenre,
+)
+
+
+def get_rating_expression(score_sum, reviews_count):
+    """Средняя оценка; NULL, если отзывов нет."""
+    return Cast(score_sum, FloatField()) / NullIf(reviews_count, 0)
+
+
+def get_top_rating_expression(rating, count_delta=0):
+    """Рейтинг для лучших произведений.
+
+    NULL, пока у произведения меньше TOP_TITLES_MIN_REVIEWS отзывов;
+    count_delta - изменение числа отзывов в том же UPDATE.
+    """
+    return Case(
+        When(
+            reviews_count__gte=settings.TOP_TITLES_MIN_REVIEWS - count_delta,
+            then=rating,
+        ),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def get_weighted_rating_expression(score_sum, reviews_count, mean):
+    """Байесовское среднее: к оценкам произведения добавляется
+    WEIGHTED_RATING_PRIOR_COUNT оценок, равных средней по всем отзывам.
+
+    NULL, если у произведения нет отзывов.
+    """
+    prior_count = settings.WEIGHTED_RATING_PRIOR_COUNT
+    return (
+        get_rating_expression(score_sum, reviews_count) * reviews_count
+        + mean * prior_count
+    ) / (reviews_count + prior_count)
+
+
+def get_weighted_mean_expression():
+    """Средняя, от которой считается взвешенный рейтинг, из RatingStats."""
+    return Subquery(
+        RatingStats.objects.filter(pk=RatingStats.SINGLETON_ID).values(
+            'weighted_mean'
+        ),
+        output_field=FloatField(),
+    )
+
+
+def update_weighted_mean():
+    """Делает текущую среднюю по всем отзывам опорной.
+
+    После этого взвешенный рейтинг всех произведений нужно пересчитать.
+    """
+    RatingStats.objects.filter(pk=RatingStats.SINGLETON_ID).update(
+        weighted_mean=get_rating_expression(
+            F('score_sum'), F('reviews_count')
+        ),
+        weighted_mean_stale=False,
+    )
+
+
+def mark_weighted_mean_stale(max_drift):
+    """Отмечает опорную среднюю устаревшей, если текущая ушла от неё
+    дальше max_drift.
+
+    Одно UPDATE строки RatingStats: пересчёт всех произведений
+    выполняет команда refresh_weighted_ratings вне запроса. Если
+    опорной средней ещё нет, ею сразу становится текущая.
+    """
+    mean = get_rating_expression(F('score_sum'), F('reviews_count'))
+    RatingStats.objects.filter(
+        Q(weighted_mean__isnull=True, reviews_count__gt=0)
+        | Q(weighted_mean__gt=mean + max_drift)
+        | Q(weighted_mean__lt=mean - max_drift),
+        pk=RatingStats.SINGLETON_ID,
+        weighted_mean_stale=False,
+    ).update(
+        weighted_mean=Coalesce(F('weighted_mean'), mean),
+        weighted_mean_stale=True,
+    )
+
+
+def rebuild_weighted_ratings(titles):
+    """Пересчитывает взвешенный рейтинг от опорной средней одним UPDATE."""
+    return titles.update(weighted_rating=get_weighted_rating_expression(
+        F('score_sum'), F('reviews_count'), get_weighted_mean_expression()
+    ))
+
+
+def change_title_rating(title_id, score_delta, count_delta):
+    """Изменяет счётчики и рейтинги произведения и общую статистику.
+
+    В правой части UPDATE поля читаются со старыми значениями,
+    поэтому рейтинг считается сразу от новых суммы и количества.
+    Взвешенный рейтинг всех произведений считается от одной опорной
+    средней; когда средняя по всем отзывам уходит от неё дальше
+    WEIGHTED_RATING_MEAN_DRIFT, опорная средняя только отмечается
+    устаревшей, а не пересчитывается вместе со всем каталогом.
+    """
+    updated = RatingStats.objects.filter(
+        pk=RatingStats.SINGLETON_ID
+    ).update(
+        score_sum=F('score_sum') + score_delta,
+        reviews_count=F('reviews_count') + count_delta,
+    )
+    if not updated:
+        # Строки ещё нет (например, после очистки таблиц): отзыв уже
+        # записан или удалён, поэтому агрегат по отзывам её восстановит.
+        rebuild_rating_stats()
+    mark_weighted_mean_stale(settings.WEIGHTED_RATING_MEAN_DRIFT)
+    score_sum = F('score_sum') + score_delta
+    reviews_count = F('reviews_count') + count_delta
+    rating = get_rating_expression(score_sum, reviews_count)
+    Title.objects.filter(pk=title_id).update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        rating=rating,
+        top_rating=get_top_rating_expression(rating, count_delta),
+        weighted_rating=get_weighted_rating_expression(
+            score_sum, reviews_count, get_weighted_mean_expression()
+        ),
+    )
+
+
+def change_score_count(title_id, score, delta):
+    """Изменяет количество отзывов с оценкой score у произведения."""
+    updated = ScoreCount.objects.filter(title_id=title_id, score=score).update(
+        count=F('count') + delta
+    )
+    # Уменьшать несуществующую строку не нужно: её уже удалил каскад
+    # вместе с произведением.
+    if not updated and delta > 0:
+        ScoreCount.objects.create(title_id=title_id, score=score, count=delta)
+
+
+def change_comments_count(review_id, delta):
+    """Изменяет количество комментариев к отзыву одним UPDATE."""
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + delta
+    )
+
+
+def rebuild_comments_counts(reviews):
+    """Пересчитывает количество комментариев для набора отзывов."""
+    comments = (
+        Comment.objects.filter(review_id=OuterRef('pk'))
+        .order_by().values('review_id')
+        .annotate(value=Count('id')).values('value')
+    )
+    return reviews.update(comments_count=Coalesce(
+        Subquery(comments), 0, output_field=IntegerField()
+    ))
+
+
+def rebuild_score_counts(titles):
+    """Пересчитывает распределение оценок для набора произведений."""
+    ScoreCount.objects.filter(title__in=titles).delete()
+    rows = (
+        Review.objects.filter(title__in=titles)
+        .order_by()
+        .values('title_id', 'score')
+        .annotate(count=Count('id'))
+    )
+    ScoreCount.objects.bulk_create(ScoreCount(**row) for row in rows)
+
+
+def get_rating_distributions(title_ids):
+    """Распределение оценок от минимальной до максимальной по id
+    произведения; для каждой оценки, в том числе нулевой, есть ключ.
+    """
+    scores = range(
+        settings.SCORE_MIN_LIMIT_VALUE, settings.SCORE_MAX_LIMIT_VALUE + 1
+    )
+    distributions = {
+        title_id: dict.fromkeys(scores, 0) for title_id in title_ids
+    }
+    rows = ScoreCount.objects.filter(title_id__in=title_ids).values_list(
+        'title_id', 'score', 'count'
+    )
+    for title_id, score, count in rows:
+        distributions[title_id][score] = count
+    return distributions
+
+
+def rebuild_rating_stats():
+    """Пересчитывает общую статистику оценок по отзывам."""
+    totals = Review.objects.aggregate(
+        score_sum=Coalesce(Sum('score'), 0),
+        reviews_count=Count('id'),
+    )
+    RatingStats.objects.update_or_create(
+        pk=RatingStats.SINGLETON_ID, defaults=totals
+    )
+
+
+def rebuild_title_ratings(titles):
+    """Пересчитывает счётчики и рейтинги по отзывам для набора произведений.
+
+    Взвешенный рейтинг считается от опорной средней из RatingStats,
+    рейтинг лучших - вторым UPDATE по уже пересчитанным полям.
+    """
+    reviews = Review.objects.filter(
+        title_id=OuterRef('pk')
+    ).order_by().values('title_id')
+    score_sum = Coalesce(
+        Subquery(reviews.annotate(value=Sum('score')).values('value')),
+        0,
+        output_field=IntegerField(),
+    )
+    reviews_count = Coalesce(
+        Subquery(reviews.annotate(value=Count('id')).values('value')),
+        0,
+        output_field=IntegerField(),
+    )
+    updated = titles.update(
+        score_sum=score_sum,
+        reviews_count=reviews_count,
+        rating=get_rating_expression(score_sum, reviews_count),
+        weighted_rating=get_weighted_rating_expression(
+            score_sum, reviews_count, get_weighted_mean_expression()
+        ),
+    )
+    titles.update(top_rating=get_top_rating_expression(F('rating')))
+    return updated
+
+
+def get_top_titles(titles, category=None, genre=None):
+    """Произведения с наибольшим рейтингом и не менее
+    TOP_TITLES_MIN_REVIEWS отзывов.
+
+    top_rating заполнен только у произведений с достаточным числом
+    отзывов, а порядок (-top_rating, -id) совпадает с индексами по
+    top_rating и (category, top_rating): база читает индекс с конца,
+    минуя произведения с малым числом отзывов, и останавливается после
+    нужного числа строк. Жанр проверяется коррелированным подзапросом
+    по уникальному индексу (title, genre) для каждой прочитанной строки.
+    """
+    titles = titles.filter(top_rating__isnull=False)
+    if category:
+        titles = titles.filter(category__slug=category)
+    if genre:
+        titles = titles.filter(Exists(TitleGenre.objects.filter(
+            title_id=OuterRef('pk'), genre__slug=genre
+        )))
+    return titles.order_by('-top_rating', '-id')
+
+
+def limit_per_parent(queryset, parent_field, parent_ids, limit):
+    """Не больше limit первых строк queryset у каждого из parent_ids.
+
+    На каждого родителя - подзапрос с LIMIT по индексу (parent,
+    сортировка queryset), подзапросы объединены UNION ALL. Читается
+    не больше limit строк на родителя, сколько бы их ни было всего.
+    """
+    first_ids = [
+        queryset.model.objects.filter(pk__in=queryset.filter(
+            **{parent_field: parent_id}
+        ).values('pk')[:limit]).order_by().values('pk')
+        for parent_id in parent_ids
+    ]
+    if not first_ids:
+        return queryset.none()
+    return queryset.filter(
+        pk__in=first_ids[0].union(*first_ids[1:], all=True)
+    )
+
+
+def prefetch_per_parent(parents, queryset, parent_field, limit, to_attr):
+    """Записывает в to_attr родителей их первые limit строк queryset.
+
+    Один запрос на PREFETCH_PARENTS_BATCH_SIZE родителей: SQLite
+    ограничивает число частей UNION в одном запросе.
+    """
+    attname = queryset.model._meta.get_field(parent_field).attname
+    children = {parent.pk: [] for parent in parents}
+    parent_ids = list(children)
+    batch_size = settings.PREFETCH_PARENTS_BATCH_SIZE
+    for start in range(0, len(parent_ids), batch_size):
+        for child in limit_per_parent(
+            queryset,
+            parent_field,
+            parent_ids[start:start + batch_size],
+            limit,
+        ):
+            children[getattr(child, attname)].append(child)
+    for parent in parents:
+        setattr(parent, to_attr, children[parent.pk])
@@ -0,0 +1,30 @@
+# Generated by Django 3.2 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+from api_yamdb.utils import normalize_text
+
+
+def fill_normalized(apps, schema_editor):
+    User = apps.get_model('users', 'CustomUser')
+    users = list(User.objects.only('id', 'username'))
+    for user in users:
+        user.username_normalized = normalize_text(user.username)
+    User.objects.bulk_update(users, ('username_normalized',), batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0004_alter_customuser_username'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='username_normalized',
+            field=models.TextField(db_index=True, default='', editable=False, verbose_name='Пользователь для поиска'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(fill_normalized, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 17:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_customuser_username_normalized'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='is_deleted',
+            field=models.BooleanField(default=False, editable=False, help_text='Скрыт из API и удаляется фоновой очисткой.', verbose_name='Удалён'),
+        ),
+    ]
@@ -2,6 +2,7 @@ from django.contrib.auth.models import AbstractUser
 from django.db import models
 
 from api_yamdb import settings
+from api_yamdb.utils import NormalizedFieldsMixin
 from .validators import validate_username, username_validator
 
 
@@ -11,7 +12,7 @@ class UserRole(models.TextChoices):
     USER = 'user'
 
 
-class CustomUser(AbstractUser):
+class CustomUser(NormalizedFieldsMixin, AbstractUser):
     """Переопределяем модель User.
 
     Добавили поля role, bio,
@@ -20,6 +21,8 @@ class CustomUser(AbstractUser):
     так как они удовлетворяют требованиям.
     """
 
+    normalized_fields = {'username_normalized': 'username'}
+
     username = models.CharField(
         verbose_name='Пользователь',
         max_length=settings.USERNAME_MAX_LENGHT,
@@ -27,6 +30,11 @@ class CustomUser(AbstractUser):
         help_text='Имя пользователя',
         validators=[validate_username, username_validator],
     )
+    username_normalized = models.TextField(
+        verbose_name='Пользователь для поиска',
+        editable=False,
+        db_index=True,
+    )
     email = models.EmailField(verbose_name='E-mail', unique=True)
     bio = models.TextField(verbose_name='Биография', blank=True)
     role = models.CharField(
@@ -35,6 +43,12 @@ class CustomUser(AbstractUser):
         choices=UserRole.choices,
         default=UserRole.USER,
     )
+    is_deleted = models.BooleanField(
+        verbose_name='Удалён',
+        default=False,
+        editable=False,
+        help_text='Скрыт из API и удаляется фоновой очисткой.',
+    )
 
     class Meta:
         verbose_name = 'пользователь'
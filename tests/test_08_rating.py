@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08TitleRating:
+
+    TITLE_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    REVIEW_DETAIL_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/'
+    )
+
+    def get_rating(self, client, title_id):
+        response = client.get(
+            self.TITLE_DETAIL_URL_TEMPLATE.format(title_id=title_id)
+        )
+        assert response.status_code == HTTPStatus.OK
+        return response.json().get('rating')
+
+    def test_01_rating_follows_review_changes(self, client, admin_client,
+                                              user_client, moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(admin_client, title_id, 'Отлично', 10)
+        response = create_single_review(user_client, title_id, 'Плохо', 3)
+        review_id = response.json()['id']
+        assert self.get_rating(client, title_id) == 6, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'создании отзыва.'
+        )
+
+        user_client.patch(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            ),
+            data={'score': 8},
+        )
+        assert self.get_rating(client, title_id) == 9, (
+            'Проверьте, что рейтинг произведения пересчитывается при '
+            'изменении оценки в отзыве.'
+        )
+
+        moderator_client.delete(
+            self.REVIEW_DETAIL_URL_TEMPLATE.format(
+                title_id=title_id, review_id=review_id
+            )
+        )
+        title = Title.objects.get(id=title_id)
+        assert (title.reviews_count, title.score_sum) == (1, 10), (
+            'Проверьте, что при удалении отзыва счётчики произведения '
+            'уменьшаются.'
+        )
+
+    def test_02_rating_on_cascade_delete(self, client, admin_client, user,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Так себе', 2)
+        user.delete()
+        assert self.get_rating(client, title_id) is None, (
+            'Проверьте, что рейтинг произведения сбрасывается, если его '
+            'отзывы удалены каскадно.'
+        )
+
+    def test_03_rebuild_counters_command(self, client, admin_client,
+                                         user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Хорошо', 7)
+        Title.objects.update(score_sum=0, reviews_count=0, rating=None)
+        Review.objects.update(score=5)
+
+        call_command('rebuild_counters', batch_size=1)
+
+        title = Title.objects.get(id=title_id)
+        assert (title.reviews_count, title.score_sum) == (1, 5), (
+            'Проверьте, что команда `rebuild_counters` восстанавливает '
+            'счётчики отзывов.'
+        )
+        assert self.get_rating(client, title_id) == 5
@@ -0,0 +1,92 @@
+import pytest
+
+from reviews.models import Category, Genre, Title
+from tests.utils import create_genre, create_titles
+
+
+def create_many_titles(count):
+    category = Category.objects.create(name='Фильм', slug='films')
+    genres = [
+        Genre.objects.create(name=f'Жанр {idx}', slug=f'genre-{idx}')
+        for idx in range(3)
+    ]
+    for idx in range(count):
+        title = Title.objects.create(
+            name=f'Произведение {idx}', year=2000, category=category
+        )
+        title.genre.set(genres)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09TitleQueries:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+
+    # COUNT, произведения с категориями, жанры.
+    LIST_QUERIES = 3
+    # Произведение с категорией, жанры.
+    RETRIEVE_QUERIES = 2
+    # Пользователь, категория, жанры, INSERT, BEGIN, текущие жанры,
+    # отсутствующие связи, INSERT в связующую таблицу, жанры для ответа.
+    CREATE_QUERIES = 9
+    # Пользователь, произведение с категорией, жанры, категория, жанры,
+    # UPDATE, BEGIN, текущие жанры, отсутствующие связи, INSERT в связующую
+    # таблицу, жанры для ответа.
+    UPDATE_QUERIES = 11
+
+    @pytest.mark.parametrize('titles_count', (1, 10))
+    def test_01_list_queries(self, client, django_assert_num_queries,
+                             titles_count):
+        create_many_titles(titles_count)
+        with django_assert_num_queries(self.LIST_QUERIES):
+            response = client.get(self.TITLES_URL)
+        assert len(response.json()['results']) == titles_count, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` выполняет '
+            f'{self.LIST_QUERIES} запроса к базе независимо от размера '
+            'страницы.'
+        )
+
+    def test_02_retrieve_queries(self, client, django_assert_num_queries):
+        create_many_titles(1)
+        title = Title.objects.get()
+        with django_assert_num_queries(self.RETRIEVE_QUERIES):
+            response = client.get(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=title.id)
+            )
+        assert len(response.json()['genre']) == 3
+
+    @pytest.mark.parametrize('genres_count', (1, 3))
+    def test_03_create_queries(self, admin_client, django_assert_num_queries,
+                               genres_count):
+        genres = create_genre(admin_client)
+        Category.objects.create(name='Фильм', slug='films')
+        data = {
+            'name': 'Терминатор',
+            'year': 1984,
+            'genre': [genre['slug'] for genre in genres[:genres_count]],
+            'category': 'films',
+        }
+        with django_assert_num_queries(self.CREATE_QUERIES):
+            response = admin_client.post(self.TITLES_URL, data=data)
+        assert len(response.json()['genre']) == genres_count, (
+            f'Проверьте, что POST-запрос к `{self.TITLES_URL}` выполняет '
+            f'{self.CREATE_QUERIES} запросов к базе независимо от '
+            'количества жанров.'
+        )
+
+    def test_04_update_queries(self, admin_client,
+                               django_assert_num_queries):
+        titles, categories, genres = create_titles(admin_client)
+        data = {
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[1]['slug'],
+        }
+        with django_assert_num_queries(self.UPDATE_QUERIES):
+            response = admin_client.patch(
+                self.TITLES_DETAIL_URL_TEMPLATE.format(
+                    title_id=titles[1]['id']
+                ),
+                data=data,
+            )
+        assert len(response.json()['genre']) == len(genres)
@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Category, Title
+from tests.utils import create_reviews
+
+
+def collect_pages(client, url):
+    results = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что в курсорном режиме пагинации ответ не содержит '
+            'ключ `count`.'
+        )
+        results.extend(data['results'])
+        url = data['next']
+    return results
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10CursorPagination:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_titles_cursor(self, client):
+        category = Category.objects.create(name='Фильм', slug='films')
+        for idx in range(7):
+            Title.objects.create(
+                name=f'Произведение {idx}', year=2000, category=category
+            )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{self.TITLES_URL}?cursor=&limit=3')
+        assert not any(
+            'COUNT(' in query['sql'] for query in context.captured_queries
+        ), (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'не выполняет COUNT-запрос.'
+        )
+        assert len(response.json()['results']) == 3
+
+        results = collect_pages(client, f'{self.TITLES_URL}?cursor=&limit=3')
+        ids = [title['id'] for title in results]
+        assert ids == sorted(
+            Title.objects.values_list('id', flat=True)
+        ), (
+            f'Проверьте, что курсорная пагинация `{self.TITLES_URL}` '
+            'возвращает все произведения ровно один раз в порядке `id`.'
+        )
+
+    def test_02_offset_mode_is_default(self, client):
+        response = client.get(self.TITLES_URL)
+        assert 'count' in response.json(), (
+            'Проверьте, что без параметра `cursor` сохраняется прежний '
+            'формат пагинации.'
+        )
+
+    def test_03_reviews_cursor(self, client, admin_client, admin, user,
+                               user_client, moderator, moderator_client):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        reviews, titles = create_reviews(admin_client, authors_map)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+
+        results = collect_pages(client, f'{url}?cursor=&limit=2')
+        assert [review['id'] for review in results] == [
+            review['id'] for review in reversed(reviews)
+        ], (
+            f'Проверьте, что курсорная пагинация `{self.REVIEWS_URL_TEMPLATE}`'
+            ' возвращает отзывы от новых к старым.'
+        )
+
+    def test_04_invalid_cursor(self, client):
+        response = client.get(f'{self.TITLES_URL}?cursor=broken')
+        assert response.status_code == HTTPStatus.NOT_FOUND
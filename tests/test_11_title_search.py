@@ -0,0 +1,63 @@
+import pytest
+
+from reviews.models import Category, Title
+
+
+def create_search_titles():
+    category = Category.objects.create(name='Фильм', slug='films')
+    return [
+        Title.objects.create(
+            name=name, year=1990, description=description, category=category
+        )
+        for name, description in (
+            ('Терминатор', 'Фантастический боевик о киборге.'),
+            ('Крепкий орешек', 'Боевик о полицейском и террористах.'),
+            ('Чужой', 'Терминатор здесь ни при чём.'),
+        )
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11TitleSearch:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def get_names(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        return [title['name'] for title in response.json()['results']]
+
+    def test_01_search_ranked_by_prefix(self, client):
+        create_search_titles()
+        assert self.get_names(client, 'search=ТЕРМИН') == [
+            'Терминатор', 'Чужой'
+        ], (
+            'Проверьте, что параметр `search` ищет по префиксам слов без '
+            'учёта регистра, а совпадения в названии выше совпадений в '
+            'описании.'
+        )
+        assert self.get_names(client, 'search=боевик полицейск') == [
+            'Крепкий орешек'
+        ]
+        assert self.get_names(client, 'search=""') == []
+
+    def test_02_search_index_follows_changes(self, client):
+        titles = create_search_titles()
+        titles[2].name = 'Хищник'
+        titles[2].description = ''
+        titles[2].save()
+        titles[1].delete()
+        assert self.get_names(client, 'search=хищ') == ['Хищник'], (
+            'Проверьте, что поисковый индекс обновляется при изменении '
+            'произведения.'
+        )
+        assert self.get_names(client, 'search=боевик') == ['Терминатор'], (
+            'Проверьте, что удалённые произведения исключаются из поиска.'
+        )
+
+    def test_03_name_filter_substring(self, client):
+        create_search_titles()
+        assert self.get_names(client, 'name=РМИН') == ['Терминатор'], (
+            'Проверьте, что фильтр `name` ищет подстроку в названии без '
+            'учёта регистра.'
+        )
+        assert self.get_names(client, 'name=уж') == ['Чужой']
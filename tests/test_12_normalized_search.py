@@ -0,0 +1,72 @@
+from types import SimpleNamespace
+
+import pytest
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import NormalizedSearchFilter
+from reviews.models import Category, Genre, Title
+from tests.test_18_title_indexes import get_query_plan
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12NormalizedSearch:
+
+    def get_results(self, client, url):
+        response = client.get(url)
+        return response.json()['results']
+
+    def test_01_cyrillic_search_ignores_case(self, client):
+        Category.objects.create(name='Фильмы', slug='films')
+        Genre.objects.create(name='Драма', slug='drama')
+        for url in ('/api/v1/categories/?search=ФИЛЬМ',
+                    '/api/v1/genres/?search=драм'):
+            assert len(self.get_results(client, url)) == 1, (
+                f'Проверьте, что поиск `{url}` не зависит от регистра '
+                'кириллических букв.'
+            )
+
+    def test_02_title_short_name_filter(self, client):
+        category = Category.objects.create(name='Фильмы', slug='films')
+        Title.objects.create(name='Чужой', year=1979, category=category)
+        results = self.get_results(client, '/api/v1/titles/?name=ЧУ')
+        assert [title['name'] for title in results] == ['Чужой'], (
+            'Проверьте, что фильтр `name` не зависит от регистра '
+            'кириллических букв для коротких строк.'
+        )
+
+    def test_03_user_search(self, admin_client, admin, django_user_model):
+        django_user_model.objects.create_user(
+            username='Ёжик', email='hedgehog@yamdb.fake'
+        )
+        results = self.get_results(admin_client, '/api/v1/users/?search=ЁЖ')
+        assert [user['username'] for user in results] == ['Ёжик'], (
+            'Проверьте, что поиск пользователей не зависит от регистра '
+            'кириллических букв.'
+        )
+
+    def test_04_normalized_column_follows_name(self):
+        genre = Genre.objects.create(name='Драма', slug='drama')
+        genre.name = 'КОМЕДИЯ'
+        genre.save(update_fields=('name',))
+        genre.refresh_from_db()
+        assert genre.name_normalized == 'комедия'
+
+    def test_05_prefix_search_uses_index(self):
+        for name, slug in (('Драма', 'drama'), ('Драмеди', 'dramedy'),
+                           ('Мелодрама', 'melodrama')):
+            Genre.objects.create(name=name, slug=slug)
+        view = SimpleNamespace(search_fields=('^name_normalized',))
+        request = Request(APIRequestFactory().get('/', {'search': 'ДРАМ'}))
+        queryset = NormalizedSearchFilter().filter_queryset(
+            request, Genre.objects.order_by('slug'), view
+        )
+        assert [genre.slug for genre in queryset] == ['drama', 'dramedy'], (
+            'Проверьте, что поиск с префиксом `^` находит значения, '
+            'начинающиеся с термина.'
+        )
+        plan = get_query_plan(queryset.order_by())
+        assert not any(step.startswith('SCAN') for step in plan), (
+            'Проверьте, что поиск с префиксом `^` читает индекс по '
+            f'нормализованному полю, а не всю таблицу: {plan}'
+        )
@@ -0,0 +1,66 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Genre
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13ResponseCache:
+
+    TITLES_URL = '/api/v1/titles/'
+    TITLES_DETAIL_URL_TEMPLATE = '/api/v1/titles/{title_id}/'
+    CACHE_STATS_URL = '/api/v1/titles/cache-stats/'
+
+    def test_01_list_is_cached(self, client, admin_client,
+                               django_assert_num_queries):
+        create_titles(admin_client)
+        response = client.get(f'{self.TITLES_URL}?year=1984')
+        assert response['X-Cache'] == 'MISS'
+        with django_assert_num_queries(0):
+            cached = client.get(f'{self.TITLES_URL}?genre=&year=1984')
+        assert cached['X-Cache'] == 'HIT', (
+            f'Проверьте, что повторный GET-запрос к `{self.TITLES_URL}` '
+            'с эквивалентными параметрами берётся из кеша.'
+        )
+        assert cached.json() == response.json()
+
+    def test_02_review_invalidates_title(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.TITLES_DETAIL_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        assert client.get(url).json()['rating'] is None
+        create_single_review(admin_client, titles[0]['id'], 'Отлично', 9)
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS', (
+            'Проверьте, что новый отзыв сбрасывает кеш произведения.'
+        )
+        assert response.json()['rating'] == 9
+
+    def test_03_genre_change_invalidates_list(self, client, admin_client):
+        create_titles(admin_client)
+        client.get(self.TITLES_URL)
+        genre = Genre.objects.get(slug='drama')
+        genre.name = 'Мелодрама'
+        genre.save()
+        response = client.get(self.TITLES_URL)
+        genres = {
+            genre['name']
+            for title in response.json()['results']
+            for genre in title['genre']
+        }
+        assert 'Мелодрама' in genres, (
+            'Проверьте, что изменение жанра сбрасывает кеш списка '
+            'произведений.'
+        )
+
+    def test_04_cache_stats(self, client, admin_client, user_client):
+        assert user_client.get(self.CACHE_STATS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+        before = admin_client.get(self.CACHE_STATS_URL).json()
+        client.get(self.TITLES_URL)
+        client.get(self.TITLES_URL)
+        after = admin_client.get(self.CACHE_STATS_URL).json()
+        assert after['hits'] - before['hits'] == 1
+        assert after['misses'] - before['misses'] == 1
@@ -0,0 +1,120 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews, create_single_review, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ConditionalGet:
+
+    TITLES_URL = '/api/v1/titles/'
+    GENRES_URL = '/api/v1/genres/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def assert_not_modified(self, client, url, etag, queries):
+        with queries(0):
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с актуальным '
+            '`If-None-Match` возвращает ответ со статусом 304 без '
+            'запросов к базе.'
+        )
+        assert response['ETag'] == etag
+
+    def test_01_titles_etag(self, client, admin_client,
+                            django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        response = client.get(self.TITLES_URL)
+        etag = response['ETag']
+        assert etag and response['Last-Modified']
+        self.assert_not_modified(
+            client, self.TITLES_URL, etag, django_assert_num_queries
+        )
+
+        create_single_review(admin_client, titles[0]['id'], 'Хорошо', 7)
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag списка произведений.'
+        )
+        assert response['ETag'] != etag
+
+    def test_02_genres_etag(self, client, admin_client,
+                            django_assert_num_queries):
+        create_titles(admin_client)
+        etag = client.get(self.GENRES_URL)['ETag']
+        self.assert_not_modified(
+            client, self.GENRES_URL, etag, django_assert_num_queries
+        )
+        assert client.get(f'{self.GENRES_URL}?search=драма')['ETag'] != etag
+
+    def test_03_reviews_and_comments_etag(self, client, admin_client, admin,
+                                          user, user_client, moderator_client,
+                                          django_assert_num_queries):
+        reviews, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[0]['id']
+        )
+        comments_url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=reviews[0]['id']
+        )
+        other_reviews_url = self.REVIEWS_URL_TEMPLATE.format(
+            title_id=titles[1]['id']
+        )
+        reviews_etag = client.get(reviews_url)['ETag']
+        comments_etag = client.get(comments_url)['ETag']
+
+        user_client.post(comments_url, data={'text': 'Согласен'})
+        assert client.get(
+            comments_url, HTTP_IF_NONE_MATCH=comments_etag
+        ).status_code == HTTPStatus.OK
+        assert client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=reviews_etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что новый комментарий меняет ETag списка отзывов: '
+            'в нём выводится количество комментариев.'
+        )
+        reviews_etag = client.get(reviews_url)['ETag']
+        other_etag = client.get(other_reviews_url)['ETag']
+        self.assert_not_modified(
+            client, reviews_url, reviews_etag, django_assert_num_queries
+        )
+
+        create_single_review(
+            moderator_client, titles[0]['id'], 'Ещё отзыв', 3
+        )
+        assert client.get(
+            reviews_url, HTTP_IF_NONE_MATCH=reviews_etag
+        ).status_code == HTTPStatus.OK, (
+            'Проверьте, что новый отзыв меняет ETag списка отзывов '
+            'произведения.'
+        )
+        self.assert_not_modified(
+            client, other_reviews_url, other_etag, django_assert_num_queries
+        )
+
+    def test_04_if_modified_since(self, client, admin_client):
+        create_titles(admin_client)
+        last_modified = client.get(self.TITLES_URL)['Last-Modified']
+        response = client.get(
+            self.TITLES_URL, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+    def test_05_wildcard_does_not_hide_missing(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=titles[0]['id'], review_id=999
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            f'Проверьте, что GET-запрос к `{url}` с `If-None-Match: *` '
+            'для несуществующего отзыва возвращает ответ со статусом 404.'
+        )
+        response = client.get(self.TITLES_URL, HTTP_IF_NONE_MATCH='*')
+        assert response.status_code == HTTPStatus.OK
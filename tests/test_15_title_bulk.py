@@ -0,0 +1,106 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from rest_framework.test import APIClient
+
+from reviews.models import Category, Genre, Title
+
+
+def create_catalogue():
+    Category.objects.create(name='Фильм', slug='films')
+    for slug in ('horror', 'comedy', 'drama'):
+        Genre.objects.create(name=slug.title(), slug=slug)
+
+
+def count_title_inserts(count):
+    """INSERT-ов произведений: bulk_create делит строки по лимиту
+    параметров запроса базы."""
+    fields = [
+        field for field in Title._meta.concrete_fields
+        if not field.primary_key
+    ]
+    batch_size = connection.ops.bulk_batch_size(fields, [None] * count)
+    return -(-count // batch_size)
+
+
+def make_titles(count):
+    return [
+        {
+            'name': f'Произведение {idx}',
+            'year': 1990 + idx % 30,
+            'category': 'films',
+            'genre': ['horror', 'comedy', 'drama'][:idx % 3 + 1],
+            'description': 'Описание',
+        }
+        for idx in range(count)
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test15TitleBulk:
+
+    BULK_URL = '/api/v1/titles/bulk/'
+    # Пользователь, жанры, категории, BEGIN, id произведений,
+    # INSERT связей, жанры для ответа и INSERT-ы произведений.
+    BULK_QUERIES = 7
+
+    @pytest.mark.parametrize('count', (3, 100))
+    def test_01_bulk_create_queries(self, admin_client, count,
+                                    django_assert_num_queries):
+        create_catalogue()
+        data = make_titles(count)
+        queries = self.BULK_QUERIES + count_title_inserts(count)
+        with django_assert_num_queries(queries):
+            response = admin_client.post(self.BULK_URL, data, format='json')
+        assert response.status_code == HTTPStatus.CREATED, (
+            f'Проверьте, что POST-запрос администратора к `{self.BULK_URL}` '
+            'с корректными данными возвращает ответ со статусом 201.'
+        )
+        result = response.json()
+        assert len(result) == count
+        for sent, created in zip(data, result):
+            title = Title.objects.get(id=created['id'])
+            assert title.name == sent['name']
+            assert title.name_normalized == sent['name'].casefold()
+            assert sorted(
+                title.genre.values_list('slug', flat=True)
+            ) == sorted(sent['genre'])
+            assert [genre['slug'] for genre in created['genre']] == (
+                sent['genre']
+            )
+
+    def test_02_bulk_create_errors(self, admin_client):
+        create_catalogue()
+        data = make_titles(3)
+        data[1]['genre'] = ['horror', 'western']
+        data[2]['year'] = 3000
+        response = admin_client.post(self.BULK_URL, data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == 3 and errors[0] == {}, (
+            f'Проверьте, что `{self.BULK_URL}` возвращает ошибки по '
+            'элементу на каждое произведение.'
+        )
+        assert list(errors[1]) == ['genre'] and list(errors[2]) == ['year']
+        assert not Title.objects.exists()
+
+        response = admin_client.post(self.BULK_URL, {}, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_03_bulk_create_permissions(self, user_client):
+        create_catalogue()
+        for api_client in (APIClient(), user_client):
+            response = api_client.post(
+                self.BULK_URL, make_titles(1), format='json'
+            )
+            assert response.status_code in (
+                HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+            )
+        assert not Title.objects.exists()
+
+    def test_04_bulk_titles_are_searchable(self, admin_client, client):
+        create_catalogue()
+        admin_client.post(self.BULK_URL, make_titles(2), format='json')
+        response = client.get('/api/v1/titles/?search=произвед')
+        assert len(response.json()['results']) == 2
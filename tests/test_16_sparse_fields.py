@@ -0,0 +1,107 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.test_09_title_queries import create_many_titles
+from tests.utils import create_reviews, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16SparseFields:
+
+    TITLES_URL = '/api/v1/titles/'
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+    USERS_URL = '/api/v1/users/'
+
+    def test_01_title_fields(self, admin_client):
+        create_titles(admin_client)
+        response = admin_client.get(f'{self.TITLES_URL}?fields=id,name')
+        assert response.status_code == HTTPStatus.OK
+        for title in response.json()['results']:
+            assert set(title) == {'id', 'name'}, (
+                f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с '
+                'параметром `fields` возвращает только перечисленные поля.'
+            )
+
+    def test_02_title_omit(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?omit=genre,description'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()) == {
+            'id', 'name', 'year', 'rating', 'reviews_count', 'category'
+        }, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с '
+            'параметром `omit` не возвращает перечисленные поля.'
+        )
+
+    def test_03_unknown_field(self, admin_client):
+        response = admin_client.get(f'{self.TITLES_URL}?fields=id,secret')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если параметр `fields` содержит неизвестное поле - должен '
+            'вернуться ответ со статусом 400.'
+        )
+
+    @pytest.mark.parametrize('query, queries', (
+        # COUNT, произведения с категориями, жанры.
+        ('', 3),
+        # COUNT, произведения без категорий, без запроса жанров.
+        ('?fields=id,name,year', 2),
+        # COUNT, произведения с категориями, без запроса жанров.
+        ('?omit=genre', 2),
+    ))
+    def test_04_title_queries(self, client, django_assert_num_queries,
+                              query, queries):
+        create_many_titles(5)
+        with django_assert_num_queries(queries) as context:
+            response = client.get(f'{self.TITLES_URL}{query}')
+        assert response.status_code == HTTPStatus.OK
+        if query.startswith('?fields'):
+            sql = context.captured_queries[-1]['sql']
+            assert 'description' not in sql and 'category' not in sql, (
+                'Проверьте, что при выборе полей из базы загружаются '
+                'только нужные столбцы.'
+            )
+
+    def test_05_write_ignores_fields(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?fields=id',
+            data={'name': 'Новое название'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['name'] == 'Новое название', (
+            'Проверьте, что параметр `fields` не влияет на запросы '
+            'на изменение.'
+        )
+
+    def test_06_review_fields(self, admin_client, admin, user_client, user):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        response = admin_client.get(f'{url}?omit=text')
+        assert response.status_code == HTTPStatus.OK
+        for review in response.json()['results']:
+            assert set(review) == {
+                'id', 'author', 'score', 'pub_date', 'comments_count'
+            }
+        response = admin_client.get(f'{url}?fields=id&cursor=')
+        assert response.status_code == HTTPStatus.OK
+        assert [set(review) for review in response.json()['results']] == [
+            {'id'}, {'id'}
+        ], (
+            'Проверьте, что параметр `fields` работает и с курсорной '
+            'пагинацией отзывов.'
+        )
+
+    def test_07_user_fields(self, admin_client, admin):
+        response = admin_client.get(f'{self.USERS_URL}?fields=username,role')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [
+            {'username': admin.username, 'role': admin.role}
+        ], (
+            f'Проверьте, что GET-запрос к `{self.USERS_URL}` с параметром '
+            '`fields` возвращает только перечисленные поля.'
+        )
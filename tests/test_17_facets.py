@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17Facets:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_facets(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        response = admin_client.get(
+            f'{self.TITLES_URL}?facets=genre,category,year'
+        )
+        assert response.status_code == HTTPStatus.OK
+        facets = response.json().get('facets')
+        assert facets is not None, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}` с параметром '
+            '`facets` возвращает ключ `facets`.'
+        )
+        assert facets['year'] == [
+            {'value': 1984, 'count': 1}, {'value': 1988, 'count': 1}
+        ]
+        assert sorted(item['slug'] for item in facets['genre']) == sorted(
+            genre['slug'] for genre in genres
+        )
+        assert {item['slug'] for item in facets['category']} == {
+            category['slug'] for category in categories
+        }
+
+    def test_02_facets_follow_filters(self, admin_client):
+        _, categories, genres = create_titles(admin_client)
+        response = admin_client.get(
+            f'{self.TITLES_URL}?genre={genres[0]["slug"]}'
+            '&facets=genre,category'
+        )
+        facets = response.json()['facets']
+        assert facets['category'] == [{
+            'slug': categories[0]['slug'],
+            'name': categories[0]['name'],
+            'count': 1,
+        }], (
+            'Проверьте, что фасеты считаются по отфильтрованному списку.'
+        )
+        assert {item['slug'] for item in facets['genre']} == {
+            genres[0]['slug'], genres[1]['slug']
+        }, (
+            'Проверьте, что фасет по жанрам учитывает все жанры '
+            'отобранных произведений, а не только жанр из фильтра.'
+        )
+
+    def test_03_facet_queries(self, admin_client, django_assert_num_queries):
+        create_titles(admin_client)
+        # Пользователь, COUNT, произведения, жанры и по запросу на фасет.
+        with django_assert_num_queries(7):
+            response = admin_client.get(
+                f'{self.TITLES_URL}?facets=genre,category,year'
+            )
+        assert response.status_code == HTTPStatus.OK
+        with django_assert_num_queries(1):
+            cached = admin_client.get(
+                f'{self.TITLES_URL}?facets=genre,category,year'
+            )
+        assert cached['X-Cache'] == 'HIT'
+        assert cached.json()['facets'] == response.json()['facets'], (
+            'Проверьте, что фасеты кешируются вместе со списком.'
+        )
+
+    def test_04_unknown_facet(self, admin_client):
+        response = admin_client.get(f'{self.TITLES_URL}?facets=author')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        response = admin_client.get(self.TITLES_URL)
+        assert 'facets' not in response.json(), (
+            'Без параметра `facets` ответ не должен меняться.'
+        )
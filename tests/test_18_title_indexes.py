@@ -0,0 +1,62 @@
+import re
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from api.filters import TitleFilter
+from reviews.models import Title
+from tests.utils import create_titles
+
+# Полный просмотр таблицы или всего индекса по ней.
+FULL_SCAN = re.compile(r'\bSCAN (reviews_title|reviews_title_genre)\b')
+
+
+def get_query_plan(queryset):
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18TitleIndexes:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def test_01_year_range(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        cases = (
+            ('year_min=1985', {titles[1]['id']}),
+            ('year_max=1985', {titles[0]['id']}),
+            ('year_min=1984&year_max=1988', {t['id'] for t in titles}),
+            ('year_min=1990', set()),
+        )
+        for query, expected in cases:
+            response = admin_client.get(f'{self.TITLES_URL}?{query}')
+            assert response.status_code == HTTPStatus.OK
+            ids = {title['id'] for title in response.json()['results']}
+            assert ids == expected, (
+                f'Проверьте, что GET-запрос к `{self.TITLES_URL}?{query}` '
+                'фильтрует произведения по диапазону годов.'
+            )
+
+    @pytest.mark.parametrize('data', (
+        {'year': 1984},
+        {'year_min': 1980, 'year_max': 1990},
+        {'category': 'films'},
+        {'category': 'films', 'year': 1984},
+        {'category': 'films', 'year_min': 1980},
+        {'genre': 'drama'},
+        {'genre': 'drama', 'year': 1984},
+        {'genre': 'drama', 'category': 'films'},
+        {'name': 'Терминатор'},
+    ))
+    def test_02_filters_use_indexes(self, data):
+        queryset = TitleFilter(data, queryset=Title.objects.all()).qs
+        plan = get_query_plan(queryset)
+        scans = [step for step in plan if FULL_SCAN.search(step)]
+        assert not scans, (
+            f'Проверьте, что фильтр {data} использует индекс, а не полный '
+            f'просмотр таблицы: {plan}'
+        )
@@ -0,0 +1,52 @@
+import pytest
+
+from api.cache import get_cache
+from api.views import TitleViewSet
+from reviews.models import Title
+from tests import test_04_title
+from tests.utils import create_single_review, create_titles
+
+
+@pytest.fixture
+def serializer_path(monkeypatch):
+    monkeypatch.setattr(TitleViewSet, 'values_reader_class', None)
+
+
+class Test19TitleSerializerPath(test_04_title.Test04TitleAPI):
+    """Тесты произведений с выключенным быстрым путём list."""
+
+    @pytest.fixture(autouse=True)
+    def use_serializer_path(self, serializer_path):
+        pass
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19TitleValuesPath:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.mark.parametrize('query', (
+        '',
+        '?limit=1&offset=1',
+        '?cursor=&limit=1',
+        '?fields=id,genre',
+        '?omit=category,rating',
+        '?omit=id,name,year,rating,reviews_count,description,genre,category',
+        '?search=терминатор',
+        '?genre=horror&facets=genre,year',
+    ))
+    def test_01_same_content(self, admin_client, user_client, monkeypatch,
+                             query):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 7)
+        Title.objects.filter(id=titles[1]['id']).update(category=None)
+
+        fast = admin_client.get(f'{self.TITLES_URL}{query}')
+        get_cache().clear()
+        monkeypatch.setattr(TitleViewSet, 'values_reader_class', None)
+        slow = admin_client.get(f'{self.TITLES_URL}{query}')
+        assert slow['X-Cache'] == 'MISS'
+        assert fast.content == slow.content, (
+            f'Проверьте, что быстрый путь для `{self.TITLES_URL}{query}` '
+            'возвращает тот же ответ, что и TitleReadSerializer.'
+        )
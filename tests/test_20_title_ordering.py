@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+import pytest
+from rest_framework.exceptions import ValidationError
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.filters import StrictOrderingFilter
+from api.views import TitleViewSet
+from reviews.models import Title
+from tests.test_18_title_indexes import get_query_plan
+from tests.utils import create_single_review, create_titles
+
+
+def get_ordered_queryset(ordering):
+    request = Request(APIRequestFactory().get('/', {'ordering': ordering}))
+    return StrictOrderingFilter().filter_queryset(
+        request, Title.objects.all(), TitleViewSet()
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test20TitleOrdering:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    def create_rated_titles(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 3)
+        create_single_review(user_client, titles[1]['id'], 'Отзыв', 9)
+        return titles
+
+    def get_ids(self, client, query):
+        response = client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()['results']]
+
+    def test_01_ordering(self, admin_client, user_client):
+        first, second = (
+            title['id']
+            for title in self.create_rated_titles(admin_client, user_client)
+        )
+        cases = (
+            ('ordering=rating', [first, second]),
+            ('ordering=-rating', [second, first]),
+            ('ordering=-year', [second, first]),
+            ('ordering=name', [second, first]),
+            ('ordering=-id', [second, first]),
+        )
+        for query, expected in cases:
+            assert self.get_ids(admin_client, query) == expected, (
+                f'Проверьте, что GET-запрос к `{self.TITLES_URL}?{query}` '
+                'сортирует произведения.'
+            )
+
+    def test_02_tiebreaker(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        Title.objects.update(year=2000)
+        ids = sorted(title['id'] for title in titles)
+        assert self.get_ids(admin_client, 'ordering=year') == ids
+        assert self.get_ids(admin_client, 'ordering=-year') == ids[::-1], (
+            'Проверьте, что при равных значениях произведения упорядочены '
+            'по id в направлении сортировки.'
+        )
+
+    @pytest.mark.parametrize('query', (
+        'ordering=description',
+        'ordering=rating,,year',
+        'ordering=year,-year',
+        'ordering=year,-rating',
+        'ordering=-rating,name',
+        'ordering=rating,id',
+        'ordering=genre__name',
+        'ordering=rating&cursor=',
+    ))
+    def test_03_rejected_ordering(self, admin_client, query):
+        response = admin_client.get(f'{self.TITLES_URL}?{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.TITLES_URL}?{query}` '
+            'возвращает ответ со статусом 400.'
+        )
+
+    @pytest.mark.parametrize('ordering', (
+        'rating', '-rating', 'year', '-year', 'name', '-name', 'id', '-id',
+        'weighted_rating', '-weighted_rating',
+    ))
+    def test_04_ordering_uses_index(self, ordering):
+        queryset = get_ordered_queryset(ordering)
+        assert len(queryset.query.order_by) <= 2
+        assert queryset.query.order_by[-1].lstrip('-') == 'id'
+        plan = get_query_plan(queryset[:10])
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            f'Проверьте, что сортировка `{ordering}` выполняется по '
+            f'индексу, без сортировки во временном дереве: {plan}'
+        )
+
+    @pytest.mark.parametrize('ordering', (
+        'year,-rating', '-rating,year', 'name,year',
+    ))
+    def test_05_multi_field_ordering_rejected(self, ordering):
+        with pytest.raises(ValidationError):
+            get_ordered_queryset(ordering)
@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from api_yamdb import settings as project_settings
+from reviews.models import Title
+from reviews.utils import get_top_titles
+from tests.test_18_title_indexes import get_query_plan
+from tests.test_30_review_comments_include import count_vm_steps
+from tests.utils import create_single_review, create_titles
+
+RATED_TITLES = 20
+UNDER_THRESHOLD_TITLES = 2000
+
+
+def create_catalogue(under_threshold):
+    """Произведения с рейтингом; у большинства отзывов меньше порога."""
+    Title.objects.bulk_create(
+        Title(
+            name=f'Произведение {idx}', year=2000, reviews_count=5,
+            score_sum=5 * (idx % 9 + 1), rating=idx % 9 + 1,
+            top_rating=idx % 9 + 1,
+        )
+        for idx in range(RATED_TITLES)
+    )
+    Title.objects.bulk_create(
+        Title(
+            name=f'Одна рецензия {idx}', year=2000, reviews_count=1,
+            score_sum=10, rating=10,
+        )
+        for idx in range(under_threshold)
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21TopTitles:
+
+    TOP_URL = '/api/v1/titles/top/'
+
+    @pytest.fixture(autouse=True)
+    def min_reviews(self, monkeypatch):
+        monkeypatch.setattr(project_settings, 'TOP_TITLES_MIN_REVIEWS', 2)
+
+    def create_rated_titles(self, admin_client, clients):
+        titles, categories, genres = create_titles(admin_client)
+        extra = admin_client.post('/api/v1/titles/', data={
+            'name': 'Одна рецензия',
+            'year': 2000,
+            'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        }).json()
+        scores = ((titles[0], (6, 8)), (titles[1], (9, 10)), (extra, (10,)))
+        for title, title_scores in scores:
+            for client, score in zip(clients, title_scores):
+                create_single_review(client, title['id'], 'Отзыв', score)
+        return titles, categories, genres
+
+    def get_ids(self, client, query=''):
+        response = client.get(f'{self.TOP_URL}{query}')
+        assert response.status_code == HTTPStatus.OK
+        return [title['id'] for title in response.json()]
+
+    def test_01_top(self, admin_client, user_client, moderator_client):
+        titles, _, _ = self.create_rated_titles(
+            admin_client, (user_client, moderator_client)
+        )
+        assert self.get_ids(admin_client) == [
+            titles[1]['id'], titles[0]['id']
+        ], (
+            f'Проверьте, что GET-запрос к `{self.TOP_URL}` возвращает '
+            'произведения по убыванию рейтинга и пропускает произведения '
+            'с числом отзывов меньше порога.'
+        )
+        assert self.get_ids(admin_client, '?limit=1') == [titles[1]['id']]
+
+    def test_02_top_filters(self, admin_client, user_client,
+                            moderator_client):
+        titles, categories, genres = self.create_rated_titles(
+            admin_client, (user_client, moderator_client)
+        )
+        query = f'?category={categories[0]["slug"]}'
+        assert self.get_ids(admin_client, query) == [titles[0]['id']]
+        query = f'?genre={genres[2]["slug"]}'
+        assert self.get_ids(admin_client, query) == [titles[1]['id']]
+        assert self.get_ids(admin_client, '?genre=unknown') == []
+
+    def test_03_top_follows_reviews(self, admin_client, user_client,
+                                    moderator_client):
+        titles, _, _ = self.create_rated_titles(
+            admin_client, (user_client, moderator_client)
+        )
+        assert self.get_ids(admin_client)[0] == titles[1]['id']
+        create_single_review(admin_client, titles[0]['id'], 'Отзыв', 10)
+        create_single_review(admin_client, titles[1]['id'], 'Отзыв', 1)
+        assert self.get_ids(admin_client)[0] == titles[0]['id'], (
+            'Проверьте, что рейтинг пересчитывается при записи отзыва и '
+            'кеш лучших произведений сбрасывается.'
+        )
+
+    @pytest.mark.parametrize('query', ('?limit=0', '?limit=1000'))
+    def test_04_invalid_limit(self, admin_client, query):
+        response = admin_client.get(f'{self.TOP_URL}{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    @pytest.mark.parametrize('filters', (
+        {}, {'category': 'films'}, {'genre': 'drama'},
+        {'category': 'films', 'genre': 'drama'},
+    ))
+    def test_05_top_uses_index(self, filters):
+        create_catalogue(UNDER_THRESHOLD_TITLES)
+        queryset = get_top_titles(Title.objects.all(), **filters)[:10]
+        plan = get_query_plan(queryset)
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Проверьте, что лучшие произведения читаются по индексу '
+            f'рейтинга без сортировки каталога: {plan}'
+        )
+        assert any('top_rating_idx' in step for step in plan), plan
+
+    def test_06_work_bounded_by_limit(self):
+        create_catalogue(0)
+        queryset = get_top_titles(Title.objects.all())[:10]
+        steps = count_vm_steps(lambda: list(queryset.all()))
+        create_catalogue(UNDER_THRESHOLD_TITLES)
+        assert count_vm_steps(lambda: list(queryset.all())) < steps * 2, (
+            'Проверьте, что произведения с числом отзывов меньше порога '
+            'не читаются при выборе лучших произведений.'
+        )
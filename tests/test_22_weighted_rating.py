@@ -0,0 +1,146 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api_yamdb import settings as project_settings
+from reviews.models import RatingStats, Review, Title
+from tests.test_18_title_indexes import get_query_plan
+from tests.test_20_title_ordering import get_ordered_queryset
+from tests.utils import create_single_review, create_titles
+
+PRIOR_COUNT = 5
+
+
+def weighted(score_sum, reviews_count, mean):
+    return (score_sum + PRIOR_COUNT * mean) / (reviews_count + PRIOR_COUNT)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22WeightedRating:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.fixture(autouse=True)
+    def prior_count(self, monkeypatch):
+        monkeypatch.setattr(
+            project_settings, 'WEIGHTED_RATING_PRIOR_COUNT', PRIOR_COUNT
+        )
+
+    def create_rated_titles(self, admin_client, clients):
+        titles, _, _ = create_titles(admin_client)
+        popular, single = titles[1]['id'], titles[0]['id']
+        for client in clients:
+            create_single_review(client, popular, 'Отзыв', 8)
+        create_single_review(clients[0], single, 'Отзыв', 10)
+        return popular, single
+
+    def test_01_weighted_rating(self, admin_client, user_client,
+                                moderator_client):
+        clients = (user_client, moderator_client, admin_client)
+        popular, single = self.create_rated_titles(admin_client, clients)
+        stats = RatingStats.objects.get()
+        assert (stats.score_sum, stats.reviews_count) == (34, 4), (
+            'Проверьте, что общая статистика оценок обновляется при '
+            'создании отзыва.'
+        )
+        call_command('refresh_weighted_ratings', stdout=None)
+        mean = 34 / 4
+        assert Title.objects.get(id=single).weighted_rating == (
+            pytest.approx(weighted(10, 1, mean))
+        )
+        response = admin_client.get(
+            f'{self.TITLES_URL}?fields=id,rating,weighted_rating'
+            '&ordering=-weighted_rating'
+        )
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert [title['id'] for title in results] == [single, popular]
+        assert results[0]['rating'] == 10
+        assert results[0]['weighted_rating'] == pytest.approx(8.75), (
+            'Проверьте, что взвешенный рейтинг учитывает среднюю оценку '
+            'по всем отзывам и число отзывов произведения.'
+        )
+
+    def test_02_same_mean_for_all_titles(self, admin_client, user_client,
+                                         moderator_client, monkeypatch):
+        monkeypatch.setattr(
+            project_settings, 'WEIGHTED_RATING_MEAN_DRIFT', 10
+        )
+        clients = (user_client, moderator_client, admin_client)
+        popular, single = self.create_rated_titles(admin_client, clients)
+        assert RatingStats.objects.get().weighted_mean == 8
+        assert Title.objects.get(id=popular).weighted_rating == (
+            pytest.approx(weighted(24, 3, 8))
+        )
+        assert Title.objects.get(id=single).weighted_rating == (
+            pytest.approx(weighted(10, 1, 8))
+        ), (
+            'Проверьте, что пока средняя не ушла дальше порога, '
+            'взвешенный рейтинг всех произведений считается от одной '
+            'опорной средней.'
+        )
+        call_command('rebuild_counters', stdout=None)
+        assert RatingStats.objects.get().weighted_mean == 34 / 4
+        assert Title.objects.get(id=popular).weighted_rating == (
+            pytest.approx(weighted(24, 3, 34 / 4))
+        ), (
+            'Проверьте, что команда rebuild_counters пересчитывает '
+            'взвешенный рейтинг по текущей средней.'
+        )
+
+    def test_03_mean_drift_marks_stale(self, admin_client, user_client,
+                                       moderator_client):
+        clients = (user_client, moderator_client, admin_client)
+        popular, single = self.create_rated_titles(admin_client, clients)
+        stats = RatingStats.objects.get()
+        assert (stats.weighted_mean, stats.weighted_mean_stale) == (8, True)
+        assert Title.objects.get(id=popular).weighted_rating == (
+            pytest.approx(weighted(24, 3, 8))
+        ), (
+            'Проверьте, что отзыв не пересчитывает взвешенный рейтинг '
+            'всех произведений, а только отмечает опорную среднюю '
+            'устаревшей.'
+        )
+        assert Title.objects.get(id=single).weighted_rating == (
+            pytest.approx(weighted(10, 1, 8))
+        )
+        call_command('refresh_weighted_ratings', batch_size=1, stdout=None)
+        stats = RatingStats.objects.get()
+        assert (stats.weighted_mean, stats.weighted_mean_stale) == (
+            34 / 4, False
+        )
+        assert Title.objects.get(id=popular).weighted_rating == (
+            pytest.approx(weighted(24, 3, 34 / 4))
+        ), (
+            'Проверьте, что команда refresh_weighted_ratings '
+            'пересчитывает взвешенный рейтинг по текущей средней.'
+        )
+
+    def test_04_delete_review(self, admin_client, user_client,
+                              moderator_client):
+        clients = (user_client, moderator_client, admin_client)
+        _, single = self.create_rated_titles(admin_client, clients)
+        Review.objects.filter(title_id=single).delete()
+        stats = RatingStats.objects.get()
+        assert (stats.score_sum, stats.reviews_count) == (24, 3)
+        assert Title.objects.get(id=single).weighted_rating is None
+
+    def test_05_optional_field(self, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        response = admin_client.get(self.TITLES_URL)
+        assert 'weighted_rating' not in response.json()['results'][0], (
+            'Проверьте, что поле `weighted_rating` выводится только по '
+            'запросу в параметре `fields`.'
+        )
+        response = admin_client.get(
+            f'{self.TITLES_URL}{titles[0]["id"]}/?fields=weighted_rating'
+        )
+        assert response.json() == {'weighted_rating': None}
+
+    @pytest.mark.parametrize(
+        'ordering', ('weighted_rating', '-weighted_rating')
+    )
+    def test_06_ordering_uses_index(self, ordering):
+        plan = get_query_plan(get_ordered_queryset(ordering)[:10])
+        assert not any('TEMP B-TREE' in step for step in plan), plan
@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews.models import Review, ScoreCount
+from tests.utils import create_single_review, create_titles
+
+
+def expected_distribution(**counts):
+    return {str(score): counts.get(f's{score}', 0) for score in range(1, 11)}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23RatingDistribution:
+
+    TITLES_URL = '/api/v1/titles/'
+    DISTRIBUTION_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/rating-distribution/'
+    )
+    BULK_URL = '/api/v1/titles/rating-distribution/'
+
+    def test_01_distribution(self, admin_client, user_client,
+                             moderator_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        for client, score in ((user_client, 8), (moderator_client, 8),
+                              (admin_client, 3)):
+            create_single_review(client, title_id, 'Отзыв', score)
+        url = self.DISTRIBUTION_URL_TEMPLATE.format(title_id=title_id)
+        response = admin_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == {
+            'id': title_id,
+            'reviews_count': 3,
+            'distribution': expected_distribution(s3=1, s8=2),
+        }, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает количество '
+            'отзывов для каждой оценки.'
+        )
+
+    def test_02_distribution_follows_reviews(self, admin_client,
+                                             user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review = create_single_review(
+            user_client, title_id, 'Отзыв', 4
+        ).json()
+        review_url = f'{self.TITLES_URL}{title_id}/reviews/{review["id"]}/'
+        user_client.patch(review_url, data={'score': 9})
+        url = self.DISTRIBUTION_URL_TEMPLATE.format(title_id=title_id)
+        assert admin_client.get(url).json()['distribution'] == (
+            expected_distribution(s9=1)
+        ), 'Проверьте, что распределение обновляется при изменении оценки.'
+        user_client.delete(review_url)
+        assert admin_client.get(url).json()['distribution'] == (
+            expected_distribution()
+        ), 'Проверьте, что распределение обновляется при удалении отзыва.'
+
+    def test_03_bulk(self, admin_client, user_client,
+                     django_assert_num_queries):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[1]['id'], 'Отзыв', 10)
+        ids = f'{titles[1]["id"]},{titles[0]["id"]},999'
+        # Пользователь, произведения, распределения.
+        with django_assert_num_queries(3):
+            response = admin_client.get(f'{self.BULK_URL}?ids={ids}')
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == [
+            {
+                'id': titles[1]['id'],
+                'reviews_count': 1,
+                'distribution': expected_distribution(s10=1),
+            },
+            {
+                'id': titles[0]['id'],
+                'reviews_count': 0,
+                'distribution': expected_distribution(),
+            },
+        ], (
+            f'Проверьте, что GET-запрос к `{self.BULK_URL}` возвращает '
+            'распределения для найденных произведений в порядке `ids`.'
+        )
+
+    @pytest.mark.parametrize('query', ('', '?ids=', '?ids=1,a'))
+    def test_04_bulk_invalid_ids(self, admin_client, query):
+        response = admin_client.get(f'{self.BULK_URL}{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_05_not_found(self, admin_client):
+        url = self.DISTRIBUTION_URL_TEMPLATE.format(title_id=999)
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_06_rebuild(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 5)
+        ScoreCount.objects.all().delete()
+        call_command('rebuild_counters', stdout=None)
+        assert list(ScoreCount.objects.values_list('score', 'count')) == [
+            (5, 1)
+        ], (
+            'Проверьте, что команда rebuild_counters восстанавливает '
+            'распределение оценок.'
+        )
+        Review.objects.all().delete()
+        assert list(ScoreCount.objects.values_list('score', 'count')) == [
+            (5, 0)
+        ]
@@ -0,0 +1,77 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+from tests.utils import create_single_review, create_titles
+
+
+def count_selects(queries, table):
+    return sum(
+        query['sql'].startswith('SELECT') and f'FROM "{table}"' in query['sql']
+        for query in queries
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test24ReviewCreate:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def test_01_single_title_lookup(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=titles[0]['id'])
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(
+                url, data={'text': 'Отзыв', 'score': 7}
+            )
+        assert response.status_code == HTTPStatus.CREATED
+        # Запросы обработчиков сигналов после INSERT не учитываются.
+        queries = context.captured_queries
+        queries = queries[:next(
+            index for index, query in enumerate(queries)
+            if query['sql'].startswith('INSERT INTO "reviews_review"')
+        )]
+        assert count_selects(queries, 'reviews_title') == 1, (
+            'Проверьте, что при создании отзыва произведение загружается '
+            'из базы один раз.'
+        )
+        assert count_selects(queries, 'reviews_review') == 0, (
+            'Проверьте, что повторный отзыв определяется по ограничению '
+            'уникальности, без предварительного запроса.'
+        )
+
+    def test_02_duplicate_review(self, admin_client, user_client, user):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        create_single_review(user_client, title_id, 'Отзыв', 7)
+        # Отзыв, записанный параллельным запросом.
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=title_id),
+            data={'text': 'Ещё отзыв', 'score': 1},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если пользователь уже оставил отзыв на произведение - '
+            'POST-запрос должен вернуть ответ со статусом 400.'
+        )
+        assert response.json() == {
+            'non_field_errors': ['Можно оставить только один отзыв!']
+        }, (
+            'Проверьте, что ошибка повторного отзыва возвращается в поле '
+            '`non_field_errors`, как другие ошибки валидации.'
+        )
+        assert Review.objects.filter(author=user).count() == 1
+        title = Title.objects.get(id=title_id)
+        assert (title.reviews_count, title.score_sum) == (1, 7), (
+            'Проверьте, что отклонённый отзыв не меняет счётчики '
+            'произведения.'
+        )
+
+    def test_03_unknown_title(self, user_client):
+        response = user_client.post(
+            self.REVIEWS_URL_TEMPLATE.format(title_id=999),
+            data={'text': 'Отзыв', 'score': 7},
+        )
+        assert response.status_code == HTTPStatus.NOT_FOUND
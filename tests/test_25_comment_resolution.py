@@ -0,0 +1,69 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.test_24_review_create import count_selects
+from tests.utils import (
+    create_single_comment,
+    create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test25CommentResolution:
+
+    COMMENTS_URL_TEMPLATE = (
+        '/api/v1/titles/{title_id}/reviews/{review_id}/comments/'
+    )
+
+    def create_comment(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 5
+        ).json()['id']
+        comment_id = create_single_comment(
+            user_client, title_id, review_id, 'Комментарий'
+        ).json()['id']
+        url = self.COMMENTS_URL_TEMPLATE.format(
+            title_id=title_id, review_id=review_id
+        )
+        return titles, url, comment_id
+
+    @pytest.mark.parametrize('method', ('list', 'create', 'update'))
+    def test_01_parents_resolved_once(self, admin_client, user_client,
+                                      method):
+        _, url, comment_id = self.create_comment(admin_client, user_client)
+        with CaptureQueriesContext(connection) as context:
+            if method == 'list':
+                response = user_client.get(url)
+            elif method == 'create':
+                response = user_client.post(url, data={'text': 'Ещё'})
+            else:
+                response = user_client.patch(
+                    f'{url}{comment_id}/', data={'text': 'Исправлено'}
+                )
+        assert response.status_code in (HTTPStatus.OK, HTTPStatus.CREATED)
+        queries = context.captured_queries
+        assert count_selects(queries, 'reviews_review') == 1, (
+            'Проверьте, что отзыв из URL загружается одним запросом '
+            'на каждый запрос к API.'
+        )
+        assert count_selects(queries, 'reviews_title') == 0, (
+            'Проверьте, что произведение проверяется тем же запросом, '
+            'что и отзыв.'
+        )
+
+    def test_02_wrong_title(self, admin_client, user_client):
+        titles, url, _ = self.create_comment(admin_client, user_client)
+        wrong_url = url.replace(
+            f'/titles/{titles[0]["id"]}/', f'/titles/{titles[1]["id"]}/'
+        )
+        response = user_client.get(wrong_url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Если отзыв не относится к произведению из URL - должен '
+            'вернуться ответ со статусом 404.'
+        )
@@ -0,0 +1,81 @@
+from http import HTTPStatus
+
+import pytest
+
+from reviews.models import Comment, Review, Title
+
+AUTHORS_COUNT = 50
+
+
+@pytest.fixture
+def authors(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(AUTHORS_COUNT)
+    ]
+
+
+@pytest.fixture
+def reviews(authors):
+    title = Title.objects.create(name='Терминатор', year=1984)
+    return [
+        Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        for author in authors
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+class Test26AuthorQueries:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    # Произведение, COUNT, отзывы с авторами.
+    REVIEWS_QUERIES = 3
+    # Отзыв, COUNT, комментарии с авторами.
+    COMMENTS_QUERIES = 3
+
+    @pytest.mark.parametrize('query', ('', '?page=3', '?fields=id,author'))
+    def test_01_review_list_queries(self, client, django_assert_num_queries,
+                                    reviews, query):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=reviews[0].title_id)
+        with django_assert_num_queries(self.REVIEWS_QUERIES):
+            response = client.get(f'{url}{query}')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert data['count'] == AUTHORS_COUNT
+        assert all(review['author'] for review in data['results']), (
+            f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+            f'отзывов тем же запросом, что и отзывы: {self.REVIEWS_QUERIES} '
+            'запроса независимо от количества отзывов.'
+        )
+
+    def test_02_review_cursor_page(self, client, django_assert_num_queries,
+                                   reviews):
+        url = self.REVIEWS_URL_TEMPLATE.format(title_id=reviews[0].title_id)
+        # Произведение, отзывы с авторами.
+        with django_assert_num_queries(2):
+            response = client.get(f'{url}?cursor=&limit={AUTHORS_COUNT}')
+        assert len(response.json()['results']) == AUTHORS_COUNT
+
+    def test_03_comment_list_queries(self, client, django_assert_num_queries,
+                                     reviews, authors):
+        review = reviews[0]
+        Comment.objects.bulk_create(
+            Comment(review=review, author=author, text='Комментарий')
+            for author in authors
+        )
+        url = (
+            f'{self.REVIEWS_URL_TEMPLATE.format(title_id=review.title_id)}'
+            f'{review.id}/comments/'
+        )
+        with django_assert_num_queries(self.COMMENTS_QUERIES):
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == AUTHORS_COUNT, (
+            f'Проверьте, что GET-запрос к `{url}` загружает авторов '
+            'комментариев тем же запросом, что и комментарии.'
+        )
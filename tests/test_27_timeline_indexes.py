@@ -0,0 +1,30 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from reviews.models import Comment, Review
+from tests.test_18_title_indexes import get_query_plan
+
+CURSOR_DATE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test27TimelineIndexes:
+
+    @pytest.mark.parametrize('queryset_factory', (
+        lambda: Review.objects.filter(title_id=1),
+        lambda: Review.objects.filter(author_id=1),
+        lambda: Comment.objects.filter(review_id=1),
+        lambda: Comment.objects.filter(author_id=1),
+    ))
+    @pytest.mark.parametrize('cursor', (False, True))
+    def test_01_timeline_uses_index(self, queryset_factory, cursor):
+        queryset = queryset_factory().select_related('author')
+        if cursor:
+            queryset = queryset.filter(pub_date__lt=CURSOR_DATE)
+        plan = get_query_plan(queryset[:10])
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Проверьте, что страница отзывов или комментариев читается по '
+            f'составному индексу без сортировки: {plan}'
+        )
+        assert any('pub_date_idx' in step for step in plan), plan
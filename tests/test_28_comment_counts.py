@@ -0,0 +1,118 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from reviews import signals
+from reviews.models import Comment, Review, Title
+from tests.utils import (
+    create_single_comment,
+    create_single_review,
+    create_titles,
+)
+
+
+@pytest.mark.django_db(transaction=True)
+class Test28CommentCounts:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def create_review(self, admin_client, user_client):
+        titles, _, _ = create_titles(admin_client)
+        title_id = titles[0]['id']
+        review_id = create_single_review(
+            user_client, title_id, 'Отзыв', 5
+        ).json()['id']
+        url = (
+            f'{self.REVIEWS_URL_TEMPLATE.format(title_id=title_id)}'
+            f'{review_id}/'
+        )
+        return title_id, review_id, url
+
+    def test_01_comments_count(self, admin_client, user_client):
+        title_id, review_id, url = self.create_review(
+            admin_client, user_client
+        )
+        comment_ids = [
+            create_single_comment(
+                client, title_id, review_id, 'Комментарий'
+            ).json()['id']
+            for client in (user_client, admin_client)
+        ]
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['comments_count'] == 2, (
+            f'Проверьте, что GET-запрос к `{url}` возвращает количество '
+            'комментариев к отзыву.'
+        )
+        user_client.patch(
+            f'{url}comments/{comment_ids[0]}/', data={'text': 'Исправлено'}
+        )
+        user_client.delete(f'{url}comments/{comment_ids[0]}/')
+        assert user_client.get(url).json()['comments_count'] == 1, (
+            'Проверьте, что количество комментариев обновляется при '
+            'изменении и удалении комментария.'
+        )
+
+    def test_02_reviews_count(self, admin_client, user_client):
+        title_id, _, url = self.create_review(admin_client, user_client)
+        title_url = f'/api/v1/titles/{title_id}/'
+        assert admin_client.get(title_url).json()['reviews_count'] == 1, (
+            f'Проверьте, что GET-запрос к `{title_url}` возвращает '
+            'количество отзывов на произведение.'
+        )
+        user_client.delete(url)
+        assert admin_client.get(title_url).json()['reviews_count'] == 0
+
+    def test_03_cascade(self, admin_client, user_client):
+        title_id, review_id, _ = self.create_review(
+            admin_client, user_client
+        )
+        create_single_comment(user_client, title_id, review_id, 'Текст')
+        Title.objects.filter(id=title_id).delete()
+        assert not Comment.objects.exists(), (
+            'Проверьте, что удаление произведения с отзывами и '
+            'комментариями проходит без ошибок.'
+        )
+
+    def test_04_counters_not_overwritten(self, admin_client, user_client):
+        title_id, review_id, url = self.create_review(
+            admin_client, user_client
+        )
+        review = Review.objects.get(id=review_id)
+        create_single_comment(user_client, title_id, review_id, 'Текст')
+        review.text = 'Сохранено устаревшим экземпляром'
+        review.save()
+        assert user_client.get(url).json()['comments_count'] == 1, (
+            'Проверьте, что сохранение отзыва не перезаписывает счётчик '
+            'комментариев.'
+        )
+
+    def test_05_rebuild(self, admin_client, user_client):
+        title_id, review_id, _ = self.create_review(
+            admin_client, user_client
+        )
+        create_single_comment(user_client, title_id, review_id, 'Текст')
+        Review.objects.update(comments_count=0)
+        call_command('rebuild_counters', stdout=None)
+        assert Review.objects.get(id=review_id).comments_count == 1, (
+            'Проверьте, что команда rebuild_counters восстанавливает '
+            'количество комментариев.'
+        )
+
+    def test_06_save_is_atomic(self, admin_client, user_client, user,
+                               monkeypatch):
+        _, review_id, _ = self.create_review(admin_client, user_client)
+
+        def fail(review_id, delta):
+            raise RuntimeError('Сбой обновления счётчика')
+
+        monkeypatch.setattr(signals, 'change_comments_count', fail)
+        with pytest.raises(RuntimeError):
+            Comment.objects.create(
+                review_id=review_id, author=user, text='Текст'
+            )
+        assert not Comment.objects.filter(review_id=review_id).exists(), (
+            'Проверьте, что комментарий и счётчик комментариев отзыва '
+            'сохраняются в одной транзакции.'
+        )
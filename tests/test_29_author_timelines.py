@@ -0,0 +1,156 @@
+from http import HTTPStatus
+
+import pytest
+from django.db.models import F
+
+from reviews.models import Comment, Review, Title
+from tests.test_18_title_indexes import get_query_plan
+
+TITLES_COUNT = 30
+
+
+@pytest.fixture
+def user_reviews(user, admin):
+    titles = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(TITLES_COUNT)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=title, author=user, text='Отзыв', score=5
+        )
+        for title in titles
+    ]
+    Review.objects.create(
+        title=titles[0], author=admin, text='Чужой отзыв', score=1
+    )
+    return reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test29AuthorTimelines:
+
+    URL_TEMPLATE = '/api/v1/users/{username}/{timeline}/'
+
+    @pytest.mark.parametrize('username', ('me', 'TestUser'))
+    def test_01_user_reviews(self, user_client, user, user_reviews,
+                             username):
+        url = self.URL_TEMPLATE.format(
+            username=username, timeline='reviews'
+        )
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что GET-запрос пользователя к `{url}` возвращает '
+            'ответ со статусом 200.'
+        )
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            f'Проверьте, что `{url}` по умолчанию использует курсорную '
+            'пагинацию без подсчёта всех отзывов.'
+        )
+        assert [review['id'] for review in data['results']] == [
+            review.id for review in reversed(user_reviews)
+        ][:len(data['results'])], (
+            f'Проверьте, что `{url}` выводит отзывы пользователя от новых '
+            'к старым.'
+        )
+        latest = data['results'][0]
+        assert (latest['author'], latest['title']) == (
+            user.username, user_reviews[-1].title_id
+        ), f'Проверьте, что `{url}` выводит id произведения отзыва.'
+
+    def test_02_user_comments(self, user_client, user, admin,
+                              user_reviews):
+        review = user_reviews[0]
+        comment = Comment.objects.create(
+            review=review, author=user, text='Комментарий'
+        )
+        Comment.objects.create(review=review, author=admin, text='Чужой')
+        url = self.URL_TEMPLATE.format(username='me', timeline='comments')
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['results'] == [{
+            'id': comment.id,
+            'text': 'Комментарий',
+            'author': user.username,
+            'pub_date': response.json()['results'][0]['pub_date'],
+            'review': review.id,
+            'title': review.title_id,
+        }], (
+            f'Проверьте, что `{url}` выводит только комментарии '
+            'пользователя с id отзыва и произведения.'
+        )
+
+    @pytest.mark.parametrize('timeline', ('reviews', 'comments'))
+    def test_03_permissions(self, client, admin_client, moderator_client,
+                            user_client, admin, user, timeline):
+        url = self.URL_TEMPLATE.format(
+            username=user.username, timeline=timeline
+        )
+        assert client.get(url).status_code == HTTPStatus.UNAUTHORIZED
+        assert user_client.get(
+            self.URL_TEMPLATE.format(
+                username=admin.username, timeline=timeline
+            )
+        ).status_code == HTTPStatus.FORBIDDEN, (
+            'Проверьте, что пользователь не видит ленту другого '
+            'пользователя.'
+        )
+        for moderating_client in (moderator_client, admin_client):
+            assert moderating_client.get(url).status_code == HTTPStatus.OK, (
+                f'Проверьте, что модератор и админ видят `{url}`.'
+            )
+        missing_url = self.URL_TEMPLATE.format(
+            username='missing', timeline=timeline
+        )
+        assert moderator_client.get(missing_url).status_code == (
+            HTTPStatus.NOT_FOUND
+        )
+        assert user_client.post(url, data={}).status_code == (
+            HTTPStatus.METHOD_NOT_ALLOWED
+        )
+
+    @pytest.mark.parametrize('query, queries', (
+        # Пользователь из токена, отзывы.
+        ('', 2),
+        ('?cursor=', 2),
+    ))
+    def test_04_queries(self, user_client, moderator_client,
+                        django_assert_num_queries, user_reviews, user,
+                        query, queries):
+        url = self.URL_TEMPLATE.format(username='me', timeline='reviews')
+        with django_assert_num_queries(queries):
+            response = user_client.get(f'{url}{query}')
+        assert response.status_code == HTTPStatus.OK, (
+            f'Проверьте, что `{url}` выполняет {queries} запроса '
+            'независимо от количества отзывов пользователя.'
+        )
+        url = self.URL_TEMPLATE.format(
+            username=user.username, timeline='reviews'
+        )
+        # Плюс поиск пользователя из URL.
+        with django_assert_num_queries(queries + 1):
+            moderator_client.get(f'{url}{query}')
+
+    def test_05_cursor(self, user_client, user_reviews):
+        url = self.URL_TEMPLATE.format(username='me', timeline='reviews')
+        next_url = f'{url}?limit=7'
+        ids = []
+        while next_url:
+            data = user_client.get(next_url).json()
+            ids.extend(review['id'] for review in data['results'])
+            next_url = data['next']
+        assert ids == [review.id for review in reversed(user_reviews)], (
+            f'Проверьте, что курсорная пагинация `{url}` проходит все '
+            'отзывы пользователя без пропусков и повторов.'
+        )
+
+    def test_06_comment_timeline_plan(self):
+        queryset = Comment.objects.filter(author_id=1).select_related(
+            'author'
+        ).annotate(title=F('review__title_id'))
+        plan = get_query_plan(queryset[:10])
+        assert not any('TEMP B-TREE' in step for step in plan), (
+            'Проверьте, что id произведения добавляется к ленте '
+            f'комментариев без сортировки всей выборки: {plan}'
+        )
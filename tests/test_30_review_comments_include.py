@@ -0,0 +1,156 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+
+from reviews.models import Comment, Review, Title
+from reviews.utils import limit_per_parent
+from tests.test_18_title_indexes import get_query_plan
+
+REVIEWS_COUNT = 4
+COMMENTS_PER_REVIEW = 5
+GROWN_COMMENTS_PER_REVIEW = 200
+
+
+@pytest.fixture
+def reviews(django_user_model):
+    title = Title.objects.create(name='Терминатор', year=1984)
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(REVIEWS_COUNT)
+    ]
+    reviews = []
+    for author in authors:
+        review = Review.objects.create(
+            title=title, author=author, text='Отзыв', score=5
+        )
+        for idx in range(COMMENTS_PER_REVIEW):
+            Comment.objects.create(
+                review=review, author=authors[idx % REVIEWS_COUNT],
+                text=f'Комментарий {idx}'
+            )
+        reviews.append(review)
+    return reviews
+
+
+def count_vm_steps(run):
+    """Число шагов виртуальной машины SQLite за вызов run()."""
+    steps = 0
+
+    def count_step():
+        nonlocal steps
+        steps += 1
+        return 0
+
+    connection.ensure_connection()
+    connection.connection.set_progress_handler(count_step, 1)
+    try:
+        run()
+    finally:
+        connection.connection.set_progress_handler(None, 1)
+    return steps
+
+
+def latest_comment_ids(review, limit):
+    return list(
+        review.comments.order_by('-pub_date', '-id')
+        .values_list('id', flat=True)[:limit]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test30ReviewCommentsInclude:
+
+    REVIEWS_URL_TEMPLATE = '/api/v1/titles/{title_id}/reviews/'
+
+    def get_url(self, reviews):
+        return self.REVIEWS_URL_TEMPLATE.format(
+            title_id=reviews[0].title_id
+        )
+
+    @pytest.mark.parametrize('query, limit', (
+        ('?include=comments', 3),
+        ('?include=comments&comments_limit=1', 1),
+        ('?include=comments&comments_limit=10&cursor=', 5),
+    ))
+    def test_01_include_comments(self, client, django_assert_num_queries,
+                                 reviews, query, limit):
+        url = self.get_url(reviews)
+        # Произведение, (COUNT), отзывы, комментарии всех отзывов страницы.
+        queries = 3 if 'cursor' in query else 4
+        with django_assert_num_queries(queries):
+            response = client.get(f'{url}{query}')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == REVIEWS_COUNT
+        for review in results:
+            review_obj = Review.objects.get(id=review['id'])
+            assert [comment['id'] for comment in review['comments']] == (
+                latest_comment_ids(review_obj, limit)
+            ), (
+                f'Проверьте, что GET-запрос к `{url}{query}` встраивает в '
+                'каждый отзыв не больше `comments_limit` последних '
+                'комментариев одним запросом.'
+            )
+        assert set(results[0]['comments'][0]) == {
+            'id', 'text', 'author', 'pub_date'
+        }
+
+    def test_02_without_include(self, client, reviews):
+        url = self.get_url(reviews)
+        response = client.get(url)
+        assert all(
+            'comments' not in review for review in response.json()['results']
+        ), 'Проверьте, что без `include` комментарии не встраиваются.'
+        response = client.get(f'{url}?include=comments&fields=id,comments')
+        assert set(response.json()['results'][0]) == {'id', 'comments'}
+        response = client.get(f'{url}{reviews[0].id}/?include=comments')
+        assert len(response.json()['comments']) == 3
+
+    @pytest.mark.parametrize('query', (
+        '?include=author',
+        '?include=comments&comments_limit=0',
+        '?include=comments&comments_limit=100',
+    ))
+    def test_03_invalid_params(self, client, reviews, query):
+        response = client.get(f'{self.get_url(reviews)}{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если параметры `include` или `comments_limit` некорректны - '
+            'должен вернуться ответ со статусом 400.'
+        )
+
+    def test_04_write_ignores_include(self, user_client, reviews):
+        url = f'{self.get_url(reviews)}?include=unknown'
+        response = user_client.post(url, data={'text': 'Отзыв', 'score': 3})
+        assert response.status_code == HTTPStatus.CREATED
+        assert 'comments' not in response.json()
+
+    def test_05_subquery_uses_index(self):
+        queryset = limit_per_parent(Comment.objects.all(), 'review', (1, 2), 3)
+        plan = get_query_plan(queryset)
+        assert any('comment_review_pub_date_idx' in step for step in plan), (
+            'Проверьте, что последние комментарии отзыва выбираются по '
+            f'индексу (review, pub_date): {plan}'
+        )
+        assert not any(step.startswith('SCAN') for step in plan), plan
+
+    def test_06_work_bounded_by_limit(self, reviews):
+        queryset = limit_per_parent(
+            Comment.objects.all(),
+            'review',
+            [review.id for review in reviews],
+            3,
+        )
+        steps = count_vm_steps(lambda: list(queryset.all()))
+        Comment.objects.bulk_create(
+            Comment(review=review, author=review.author, text='Комментарий')
+            for review in reviews
+            for _ in range(GROWN_COMMENTS_PER_REVIEW)
+        )
+        assert count_vm_steps(lambda: list(queryset.all())) < steps * 2, (
+            'Проверьте, что при встраивании комментариев читается не '
+            'больше `comments_limit` строк на отзыв, сколько бы '
+            'комментариев у отзывов ни было.'
+        )
@@ -0,0 +1,174 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+
+from reviews.models import Comment, Review, Title
+from tests.test_30_review_comments_include import count_vm_steps
+
+TITLES_COUNT = 5
+REVIEWS_PER_TITLE = 4
+GROWN_REVIEWS_PER_TITLE = 100
+
+
+@pytest.fixture
+def titles(django_user_model):
+    authors = [
+        django_user_model.objects.create_user(
+            username=f'author{idx}', email=f'author{idx}@yamdb.fake'
+        )
+        for idx in range(REVIEWS_PER_TITLE)
+    ]
+    titles = []
+    for idx in range(TITLES_COUNT):
+        title = Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for author in authors:
+            Review.objects.create(
+                title=title, author=author, text='Отзыв', score=5
+            )
+        titles.append(title)
+    return titles
+
+
+def latest_review_ids(title_id, limit):
+    return list(
+        Review.objects.filter(title_id=title_id)
+        .order_by('-pub_date', '-id')
+        .values_list('id', flat=True)[:limit]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test31TitleInclude:
+
+    TITLES_URL = '/api/v1/titles/'
+
+    @pytest.mark.parametrize('query, limit, with_author', (
+        ('?include=reviews', 3, False),
+        ('?include=reviews.author', 3, True),
+        ('?include=reviews,reviews.author&reviews_limit=1', 1, True),
+    ))
+    def test_01_include_reviews(self, client, django_assert_num_queries,
+                                titles, query, limit, with_author):
+        # COUNT, произведения с категориями, жанры, отзывы всех
+        # произведений страницы (с авторами - тем же запросом).
+        with django_assert_num_queries(4):
+            response = client.get(f'{self.TITLES_URL}{query}')
+        assert response.status_code == HTTPStatus.OK
+        results = response.json()['results']
+        assert len(results) == TITLES_COUNT
+        for title in results:
+            assert [review['id'] for review in title['reviews']] == (
+                latest_review_ids(title['id'], limit)
+            ), (
+                f'Проверьте, что GET-запрос к `{self.TITLES_URL}{query}` '
+                'встраивает в каждое произведение последние отзывы.'
+            )
+            assert all(
+                ('author' in review) == with_author
+                for review in title['reviews']
+            ), (
+                'Проверьте, что автор отзыва выводится только при '
+                '`include=reviews.author`.'
+            )
+
+    def test_02_without_include(self, client, titles):
+        response = client.get(self.TITLES_URL)
+        assert all(
+            'reviews' not in title for title in response.json()['results']
+        ), 'Проверьте, что без `include` отзывы не встраиваются.'
+
+    @pytest.mark.parametrize('query, queries, fields', (
+        # COUNT, произведения, отзывы.
+        ('?include=reviews&fields=id,reviews', 3, {'id', 'reviews'}),
+        # COUNT, произведения: отзывы не выводятся и не загружаются.
+        ('?include=reviews&fields=id,name', 2, {'id', 'name'}),
+    ))
+    def test_03_sparse_fields(self, client, django_assert_num_queries,
+                              titles, query, queries, fields):
+        with django_assert_num_queries(queries):
+            response = client.get(f'{self.TITLES_URL}{query}')
+        assert response.status_code == HTTPStatus.OK
+        assert set(response.json()['results'][0]) == fields
+
+    def test_04_detail_and_top(self, client, titles):
+        response = client.get(
+            f'{self.TITLES_URL}{titles[0].id}/?include=reviews.author'
+        )
+        assert response.status_code == HTTPStatus.OK
+        authors = [review['author'] for review in response.json()['reviews']]
+        assert authors == ['author3', 'author2', 'author1']
+        response = client.get(
+            f'{self.TITLES_URL}top/?include=reviews&reviews_limit=2'
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert all(len(title['reviews']) == 2 for title in response.json())
+
+    @pytest.mark.parametrize('query', (
+        '?include=genre',
+        '?include=reviews.title',
+        '?include=reviews&reviews_limit=0',
+        '?include=reviews&reviews_limit=21',
+    ))
+    def test_05_invalid_params(self, client, titles, query):
+        response = client.get(f'{self.TITLES_URL}{query}')
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            'Если параметры `include` или `reviews_limit` некорректны - '
+            'должен вернуться ответ со статусом 400.'
+        )
+
+    def test_06_cache_follows_included(self, client, titles):
+        url = f'{self.TITLES_URL}{titles[0].id}/?include=reviews.author'
+        review = client.get(url).json()['reviews'][0]
+        author = Review.objects.get(id=review['id']).author
+        Comment.objects.create(
+            review_id=review['id'], author=author, text='Комментарий'
+        )
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['reviews'][0]['comments_count'] == 1, (
+            'Проверьте, что новый комментарий сбрасывает кеш произведений '
+            'со встроенными отзывами.'
+        )
+        author.username = 'renamed'
+        author.save()
+        response = client.get(url)
+        assert response['X-Cache'] == 'MISS'
+        assert response.json()['reviews'][0]['author'] == 'renamed', (
+            'Проверьте, что изменение автора сбрасывает кеш произведений '
+            'со встроенными авторами отзывов.'
+        )
+
+    def test_07_write_ignores_include(self, admin_client, titles):
+        response = admin_client.patch(
+            f'{self.TITLES_URL}{titles[0].id}/?include=unknown',
+            data={'name': 'Новое название'},
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert 'reviews' not in response.json()
+
+    def test_08_work_bounded_by_limit(self, client, django_user_model,
+                                      titles):
+        url = f'{self.TITLES_URL}?include=reviews.author'
+        steps = count_vm_steps(lambda: client.get(url))
+        django_user_model.objects.bulk_create(
+            django_user_model(
+                username=f'reader{idx}', email=f'reader{idx}@yamdb.fake'
+            )
+            for idx in range(GROWN_REVIEWS_PER_TITLE)
+        )
+        authors = django_user_model.objects.filter(
+            username__startswith='reader'
+        )
+        Review.objects.bulk_create(
+            Review(title=title, author=author, text='Отзыв', score=5)
+            for title in titles
+            for author in authors
+        )
+        # bulk_create не отправляет сигналы, сбрасывающие кеш ответов.
+        cache.clear()
+        assert count_vm_steps(lambda: client.get(url)) < steps * 2, (
+            f'Проверьте, что GET-запрос к `{url}` читает не больше '
+            '`reviews_limit` отзывов на произведение страницы, сколько бы '
+            'отзывов у произведений ни было.'
+        )
@@ -0,0 +1,215 @@
+from http import HTTPStatus
+
+import pytest
+from django.core.management import call_command
+
+from api_yamdb import settings
+from reviews.deletion import purge_chunk
+from reviews.models import Comment, DeletionTask, RatingStats, Review, Title
+
+THRESHOLD = 5
+
+
+@pytest.fixture
+def threshold(monkeypatch):
+    monkeypatch.setattr(settings, 'DELETION_BACKGROUND_THRESHOLD', THRESHOLD)
+
+
+@pytest.fixture
+def content(user, admin, moderator):
+    """Два произведения: на первом отзывы всех трёх пользователей."""
+    titles = [
+        Title.objects.create(name=f'Произведение {idx}', year=2000)
+        for idx in range(2)
+    ]
+    reviews = [
+        Review.objects.create(
+            title=titles[0], author=author, text='Отзыв', score=score
+        )
+        for author, score in ((user, 2), (admin, 6), (moderator, 9))
+    ]
+    reviews.append(Review.objects.create(
+        title=titles[1], author=user, text='Отзыв', score=4
+    ))
+    for review in reviews:
+        for author in (user, admin):
+            Comment.objects.create(
+                review=review, author=author, text='Комментарий'
+            )
+    return titles, reviews
+
+
+def assert_rating_stats_consistent():
+    stats = RatingStats.objects.get()
+    assert (stats.reviews_count, stats.score_sum) == (
+        Review.objects.count(),
+        sum(Review.objects.values_list('score', flat=True)),
+    ), 'Проверьте, что фоновое удаление обновляет общие счётчики оценок.'
+
+
+@pytest.mark.django_db(transaction=True)
+class Test32ChunkedDeletion:
+
+    TITLES_URL = '/api/v1/titles/'
+    USERS_URL = '/api/v1/users/'
+    DELETIONS_URL = '/api/v1/deletions/'
+
+    def test_01_small_delete_is_immediate(self, admin_client, content):
+        titles, _ = content
+        response = admin_client.delete(f'{self.TITLES_URL}{titles[1].id}/')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert not Title.objects.filter(id=titles[1].id).exists(), (
+            'Проверьте, что произведение с небольшим каскадом удаляется '
+            'сразу.'
+        )
+        assert not DeletionTask.objects.exists()
+
+    def test_02_title_tombstone(self, client, admin_client, threshold,
+                                content):
+        titles, reviews = content
+        url = f'{self.TITLES_URL}{titles[0].id}/'
+        response = admin_client.delete(url)
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert Title.objects.get(id=titles[0].id).is_deleted
+        task = DeletionTask.objects.get()
+        assert (task.target, task.object_id, task.total) == (
+            'title', titles[0].id, 1 + 3 + 6
+        ), 'Проверьте, что большое удаление ставит задачу с оценкой строк.'
+        review_url = f'{url}reviews/{reviews[0].id}/'
+        for hidden_url in (url, f'{url}reviews/', f'{review_url}comments/',
+                           f'{url}rating-distribution/'):
+            assert client.get(hidden_url).status_code == (
+                HTTPStatus.NOT_FOUND
+            ), f'Проверьте, что `{hidden_url}` скрыт сразу после удаления.'
+        assert [
+            title['id'] for title in client.get(self.TITLES_URL).json()[
+                'results'
+            ]
+        ] == [titles[1].id]
+        assert admin_client.delete(url).status_code == HTTPStatus.NOT_FOUND
+
+    def test_03_purge_in_chunks(self, admin_client, threshold, content):
+        titles, _ = content
+        admin_client.delete(f'{self.TITLES_URL}{titles[0].id}/')
+        task = DeletionTask.objects.get()
+        chunks = []
+        while task.finished_at is None:
+            chunks.append(purge_chunk(task, 2))
+        # Шесть комментариев, три отзыва, произведение с оценками.
+        assert chunks[:-1] == [2, 2, 2, 2, 1], (
+            'Проверьте, что строки каскада удаляются пачками не больше '
+            'заданного размера, а объект - последним.'
+        )
+        assert not Title.objects.filter(id=titles[0].id).exists()
+        assert Review.objects.count() == 1
+        assert Comment.objects.count() == 2
+        task.refresh_from_db()
+        assert task.deleted == sum(chunks) and task.progress == 1.0
+        assert_rating_stats_consistent()
+
+    def test_04_user_tombstone_and_purge(self, client, admin_client,
+                                         user_client, threshold, user,
+                                         content):
+        titles, reviews = content
+        url = f'{self.USERS_URL}{user.username}/'
+        assert admin_client.delete(url).status_code == HTTPStatus.NO_CONTENT
+        assert admin_client.get(url).status_code == HTTPStatus.NOT_FOUND
+        assert user_client.get(
+            f'{self.USERS_URL}me/'
+        ).status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что удаляемый пользователь сразу теряет доступ.'
+        )
+        response = client.post(
+            '/api/v1/auth/signup/',
+            data={'username': user.username, 'email': user.email},
+        )
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+        call_command('purge_deletions', chunk_size=2, pause=0, stdout=None)
+        assert not type(user).objects.filter(id=user.id).exists()
+        assert not Review.objects.filter(author=user).exists()
+        assert not Comment.objects.filter(author=user).exists()
+        comments_counts = Review.objects.values_list(
+            'comments_count', flat=True
+        )
+        assert list(comments_counts) == [1, 1], (
+            'Проверьте, что при удалении комментариев пользователя '
+            'обновляются счётчики комментариев чужих отзывов.'
+        )
+        title = Title.objects.get(id=titles[0].id)
+        assert (title.reviews_count, title.score_sum) == (2, 15)
+        assert_rating_stats_consistent()
+        assert DeletionTask.objects.get().finished_at is not None
+
+    def test_05_progress(self, admin_client, user_client, threshold,
+                         content):
+        titles, _ = content
+        admin_client.delete(f'{self.TITLES_URL}{titles[0].id}/')
+        task = DeletionTask.objects.get()
+        purge_chunk(task, 3)
+        response = admin_client.get(f'{self.DELETIONS_URL}{task.id}/')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert (data['deleted'], data['total'], data['progress']) == (
+            3, 10, 0.3
+        ), (
+            f'Проверьте, что `{self.DELETIONS_URL}` показывает ход '
+            'фонового удаления.'
+        )
+        assert data['finished_at'] is None
+        assert user_client.get(self.DELETIONS_URL).status_code == (
+            HTTPStatus.FORBIDDEN
+        )
+
+    def test_06_user_tombstone_hides_content(self, client, admin_client,
+                                             threshold, user, content):
+        titles, reviews = content
+        admin_client.delete(f'{self.USERS_URL}{user.username}/')
+        reviews_url = f'{self.TITLES_URL}{titles[0].id}/reviews/'
+        visible = {reviews[1].id, reviews[2].id}
+        response = client.get(reviews_url)
+        assert {
+            review['id'] for review in response.json()['results']
+        } == visible, (
+            'Проверьте, что отзывы удаляемого пользователя скрываются '
+            'сразу, до фонового удаления.'
+        )
+        response = client.get(f'{reviews_url}{reviews[1].id}/comments/')
+        assert [
+            comment['author'] for comment in response.json()['results']
+        ] == [reviews[1].author.username], (
+            'Проверьте, что комментарии удаляемого пользователя '
+            'скрываются сразу, до фонового удаления.'
+        )
+        response = client.get(f'{reviews_url}{reviews[0].id}/comments/')
+        assert response.status_code == HTTPStatus.NOT_FOUND
+        response = client.get(f'{reviews_url}?include=comments')
+        for review in response.json()['results']:
+            assert user.username not in {
+                comment['author'] for comment in review['comments']
+            }
+        response = client.get(f'{self.TITLES_URL}?include=reviews')
+        embedded = {
+            review['id']
+            for title in response.json()['results']
+            for review in title['reviews']
+        }
+        assert embedded == visible, (
+            'Проверьте, что отзывы удаляемого пользователя не '
+            'встраиваются в произведения.'
+        )
+
+    def test_07_title_tombstone_resets_etags(self, client, admin_client,
+                                             threshold, content):
+        titles, reviews = content
+        comments_url = (
+            f'{self.TITLES_URL}{titles[0].id}/reviews/{reviews[0].id}/'
+            'comments/'
+        )
+        etag = client.get(comments_url)['ETag']
+        admin_client.delete(f'{self.TITLES_URL}{titles[0].id}/')
+        response = client.get(comments_url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что после удаления произведения условный запрос '
+            'к комментариям его отзывов не возвращает ответ 304.'
+        )